@@ -6,15 +6,24 @@ prompts stored in the database instead of hardcoded prompts.
 """
 
 import asyncio
+import hashlib
 import httpx
 import logging
+import time
+import orjson
+from itertools import islice
 from typing import Dict, Any, Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 
 from marbix.core.config import settings
+from marbix.core.redis import get_redis
+from marbix.core.log_context import request_id_var
 from marbix.utils.prompt_utils import get_formatted_prompt
-from marbix.crud.prompt import increment_prompt_usage
+from marbix.utils.retry import sleep_or_give_up
+from marbix.utils.single_flight import SingleFlight
+from marbix.utils.prompt_cache import make_prompt_cache_key, get_cached_prompt, set_cached_prompt
+from marbix.services.prompt_usage_service import prompt_usage_service
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -28,6 +37,85 @@ MAX_RETRIES = 3
 RETRY_DELAY = 5
 REQUEST_TIMEOUT = 600  # 10 minutes
 
+# Source extraction
+MAX_SOURCES = 20
+_URL_PREFIXES = ("http://", "https://")
+
+# Business fields substituted into the research prompt
+_BUSINESS_FIELDS = (
+    "business_type",
+    "business_goal",
+    "product_data",
+    "target_audience_info",
+    "company_name",
+    "competitors",
+    "current_volume",
+    "actions",
+    "promotion_budget",
+    "team_budget",
+)
+_BUSINESS_DEFAULTS = {"location": "Global"}
+
+# Rate-limiting policy for Perplexity, kept separate from the connection pool size
+_research_semaphore = asyncio.Semaphore(settings.PERPLEXITY_MAX_CONCURRENCY)
+
+# Research requests currently running in this process, keyed by prompt cache key
+_research_flight = SingleFlight()
+
+# Shared HTTP client, reused across research calls and ARQ jobs
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide Perplexity HTTP client, creating it on first use.
+    
+    Reusing one client keeps TCP/TLS connections alive between retries and jobs.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        if not settings.PERPLEXITY_API_KEY:
+            raise ValueError("PERPLEXITY_API_KEY is required")
+        
+        _client = httpx.AsyncClient(
+            # Long read timeout for deep research; fail fast on connect / pool waits
+            timeout=httpx.Timeout(connect=10.0, read=REQUEST_TIMEOUT, write=30.0, pool=5.0),
+            limits=httpx.Limits(
+                max_connections=1000,
+                max_keepalive_connections=100,
+                keepalive_expiry=REQUEST_TIMEOUT + 30
+            ),
+            http2=True,
+            headers={
+                "Authorization": f"Bearer {settings.PERPLEXITY_API_KEY}",
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            },
+            event_hooks={"request": [_mark_request_start], "response": [_log_response_latency]}
+        )
+    return _client
+
+
+async def _mark_request_start(request: httpx.Request):
+    request.extensions["marbix_started_at"] = time.monotonic()
+
+
+async def _log_response_latency(response: httpx.Response):
+    started_at = response.request.extensions.get("marbix_started_at")
+    if started_at is not None:
+        logger.debug(
+            "Perplexity responded %d after %.2fs (%s)",
+            response.status_code, time.monotonic() - started_at, response.http_version
+        )
+
+
+async def close_http_client():
+    """Close the shared Perplexity HTTP client (called on worker shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 class ResearcherAgent:
     """
@@ -37,20 +125,24 @@ class ResearcherAgent:
     comprehensive research requests to the Perplexity API.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self):
         """
         Initialize the researcher agent.
         
-        :param db: Database session for retrieving prompts and updating usage
+        The agent holds no per-request state; one instance is shared by all
+        jobs (see get_researcher_agent) and the session is passed per call.
         """
-        self.db = db
-        self.api_key = settings.PERPLEXITY_API_KEY
-        
-        if not self.api_key:
-            raise ValueError("PERPLEXITY_API_KEY is required")
+        # Everything except the prompt is constant per agent
+        self._body_template = {
+            "model": MODEL_NAME,
+            "max_tokens": 6000,
+            "temperature": 0.1,
+            "return_citations": True
+        }
     
     async def conduct_research(
         self, 
+        db: Session,
         request_data: Dict[str, Any], 
         request_id: str,
         prompt_name: str = "perplexity-prompt"
@@ -58,28 +150,37 @@ class ResearcherAgent:
         """
         Conduct comprehensive market research using Perplexity API.
         
+        :param db: Database session for retrieving the prompt
         :param request_data: Business data for research context
         :param request_id: Unique identifier for the research request
         :param prompt_name: Name of the prompt to retrieve from database
         :return: Research results with content and sources
         """
+        # Bind request_id once; RequestIdFilter adds it to every log record
+        token = request_id_var.set(request_id)
         try:
-            logger.info(f"Starting research for request {request_id} using prompt '{prompt_name}'")
+            logger.info("Starting research using prompt '%s'", prompt_name)
             
             # Get research prompt from database
-            research_prompt = await self._get_research_prompt(prompt_name, request_data)
+            research_prompt = await self._get_research_prompt(db, prompt_name, request_data)
             if not research_prompt:
                 return {
                     "success": False,
                     "error": f"Research prompt '{prompt_name}' not found in database"
                 }
             
-            # Conduct the research
-            research_result = await self._make_research_request(research_prompt, request_id)
+            # Reuse a stored result if the same prompt was researched recently
+            cache_key = self._research_cache_key(research_prompt)
+            research_result = await self._get_cached_research(cache_key)
+            if research_result:
+                logger.info("Using cached research")
+            else:
+                # Conduct the research (identical concurrent requests share one call)
+                research_result = await self._research_once(cache_key, research_prompt, request_id)
             
             # Increment prompt usage if research was successful
             if research_result.get("success"):
-                await self._increment_prompt_usage(prompt_name)
+                self._increment_prompt_usage(prompt_name)
             
             return research_result
             
@@ -90,11 +191,14 @@ class ResearcherAgent:
                 "success": False,
                 "error": error_msg
             }
+        finally:
+            request_id_var.reset(token)
     
-    async def _get_research_prompt(self, prompt_name: str, request_data: Dict[str, Any]) -> Optional[str]:
+    async def _get_research_prompt(self, db: Session, prompt_name: str, request_data: Dict[str, Any]) -> Optional[str]:
         """
         Retrieve and format research prompt from database.
         
+        :param db: Database session
         :param prompt_name: Name of the prompt to retrieve
         :param request_data: Business data for variable substitution
         :return: Formatted prompt string or None if not found
@@ -102,33 +206,95 @@ class ResearcherAgent:
         try:
             # Extract key business data for prompt formatting
             business_context = {
-                "business_type": request_data.get("business_type", "").strip(),
-                "business_goal": request_data.get("business_goal", "").strip(),
-                "product_data": request_data.get("product_data", "").strip(),
-                "target_audience_info": request_data.get("target_audience_info", "").strip(),
-                "location": request_data.get("location", "Global").strip(),
-                "company_name": request_data.get("company_name", "").strip(),
-                "competitors": request_data.get("competitors", "").strip(),
-                "current_volume": request_data.get("current_volume", "").strip(),
-                "actions": request_data.get("actions", "").strip(),
-                "promotion_budget": request_data.get("promotion_budget", "").strip(),
-                "team_budget": request_data.get("team_budget", "").strip()
+                field: (request_data.get(field) or "").strip()
+                for field in _BUSINESS_FIELDS
             }
+            business_context["location"] = (
+                request_data.get("location") or _BUSINESS_DEFAULTS["location"]
+            ).strip()
+            
+            cache_key = make_prompt_cache_key(prompt_name, business_context)
+            prompt = get_cached_prompt(cache_key)
+            if prompt:
+                logger.info("Using cached prompt '%s'", prompt_name)
+                return prompt
             
             # Get formatted prompt from database
-            prompt = get_formatted_prompt(self.db, prompt_name, **business_context)
+            prompt = await asyncio.to_thread(get_formatted_prompt, db, prompt_name, **business_context)
             
             if not prompt:
-                logger.warning(f"Prompt '{prompt_name}' not found or inactive")
+                logger.warning("Prompt '%s' not found or inactive", prompt_name)
                 return None
             
-            logger.info(f"Successfully retrieved prompt '{prompt_name}' from database")
+            set_cached_prompt(cache_key, prompt)
+            logger.info("Successfully retrieved prompt '%s' from database", prompt_name)
             return prompt
             
         except Exception as e:
-            logger.error(f"Error retrieving prompt '{prompt_name}': {str(e)}")
+            logger.error("Error retrieving prompt '%s': %s", prompt_name, e)
             return None
     
+    @staticmethod
+    def _research_cache_key(research_prompt: str) -> str:
+        """Build the Redis key for a formatted research prompt."""
+        digest = hashlib.blake2b(
+            f"{MODEL_NAME}\n{research_prompt}".encode(),
+            digest_size=32
+        ).hexdigest()
+        return f"research:{digest}"
+    
+    async def _get_cached_research(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously stored research result.
+        
+        :param cache_key: Redis key for the research prompt
+        :return: Cached research result or None on miss or Redis error
+        """
+        try:
+            cached = await get_redis().get(cache_key)
+            return orjson.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning("Research cache lookup failed: %s", e)
+            return None
+    
+    async def _cache_research(self, cache_key: str, research_result: Dict[str, Any]):
+        """
+        Store a successful research result.
+        
+        :param cache_key: Redis key for the research prompt
+        :param research_result: Result returned by the Perplexity request
+        """
+        try:
+            await get_redis().setex(cache_key, settings.RESEARCH_CACHE_TTL, orjson.dumps(research_result))
+        except Exception as e:
+            logger.warning("Failed to cache research result: %s", e)
+    
+    async def _research_once(self, cache_key: str, research_prompt: str, request_id: str) -> Dict[str, Any]:
+        """
+        Run the research request, coalescing identical in-flight requests.
+        
+        If another job is already researching the same prompt, await its result
+        instead of issuing a second Perplexity call. If that job is cancelled
+        (arq job timeout, shutdown), this job doesn't inherit the cancellation;
+        it runs the research itself.
+        
+        :param cache_key: Key identifying the research prompt
+        :param research_prompt: Formatted research prompt
+        :param request_id: Request identifier for logging
+        :return: Research results with content and sources
+        """
+        if _research_flight.in_flight(cache_key):
+            logger.info("Joining in-flight research")
+        
+        async def run() -> Dict[str, Any]:
+            async with _research_semaphore:
+                research_result = await self._make_research_request(research_prompt, request_id)
+            if research_result.get("success"):
+                await self._cache_research(cache_key, research_result)
+            return research_result
+        
+        return await _research_flight.do(cache_key, run)
+    
     async def _make_research_request(self, research_prompt: str, request_id: str) -> Dict[str, Any]:
         """
         Make research request to Perplexity API with retry logic.
@@ -137,126 +303,130 @@ class ResearcherAgent:
         :param request_id: Request identifier for logging
         :return: Research results with content and sources
         """
+        client = await get_http_client()
+        
+        # Serialized once; every retry sends the same bytes
+        body = orjson.dumps({
+            **self._body_template,
+            "messages": [{"role": "user", "content": research_prompt}]
+        })
+        
         for attempt in range(MAX_RETRIES):
             try:
-                async with httpx.AsyncClient(
-                    timeout=httpx.Timeout(REQUEST_TIMEOUT),
-                    limits=httpx.Limits(max_connections=10)
-                ) as client:
+                async with client.stream("POST", PERPLEXITY_API_URL, content=body) as response:
+                    if response.status_code == 200:
+                        # Accumulate raw bytes and parse once, skipping the bytes -> str decode
+                        buf = bytearray()
+                        async for chunk in response.aiter_bytes():
+                            buf.extend(chunk)
+                        result = orjson.loads(buf)
+                    else:
+                        await response.aread()
+                
+                if response.status_code == 200:
+                    choices = result.get("choices") or []
+                    message = (choices[0].get("message") if choices else None) or {}
+                    research_content = message.get("content")
                     
-                    response = await client.post(
-                        PERPLEXITY_API_URL,
-                        json={
-                            "model": MODEL_NAME,
-                            "messages": [
-                                {
-                                    "role": "user",
-                                    "content": research_prompt
-                                }
-                            ],
-                            "max_tokens": 6000,
-                            "temperature": 0.1,
-                            "return_citations": True
-                        },
-                        headers={
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json"
-                        }
-                    )
+                    if not research_content:
+                        logger.warning("Perplexity response had no content on attempt %d", attempt + 1)
+                        if not await sleep_or_give_up(attempt, MAX_RETRIES, RETRY_DELAY):
+                            return {
+                                "success": False,
+                                "error": "Research API returned an empty response"
+                            }
+                        continue
                     
-                    if response.status_code == 200:
-                        result = response.json()
-                        research_content = result["choices"][0]["message"]["content"]
-                        
-                        # Extract sources safely
-                        sources = await self._extract_sources(result)
-                        
-                        logger.info(f"Research completed for {request_id}, found {len(sources)} sources")
-                        
+                    # Extract sources safely
+                    sources = self._extract_sources(result)
+                    
+                    logger.info("Research completed, found %d sources", len(sources))
+                    
+                    return {
+                        "success": True,
+                        "research_content": research_content,
+                        "sources": sources,
+                        "model_used": MODEL_NAME,
+                        "completed_at": datetime.now(timezone.utc).isoformat(timespec="seconds")
+                    }
+                
+                elif response.status_code == 429:  # Rate limited
+                    logger.warning("Rate limited on attempt %d", attempt + 1)
+                    if not await sleep_or_give_up(attempt, MAX_RETRIES, RETRY_DELAY, response):
                         return {
-                            "success": True,
-                            "research_content": research_content,
-                            "sources": sources,
-                            "model_used": MODEL_NAME,
-                            "completed_at": datetime.now().isoformat()
+                            "success": False,
+                            "error": "Research API rate limit exceeded"
                         }
+                
+                else:
+                    error_text = response.text[:500]
+                    logger.error("Perplexity API error %d: %s", response.status_code, error_text)
                     
-                    elif response.status_code == 429:  # Rate limited
-                        wait_time = min(RETRY_DELAY * (2 ** attempt), 120)
-                        logger.warning(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}")
-                        await asyncio.sleep(wait_time)
-                        continue
+                    if not await sleep_or_give_up(attempt, MAX_RETRIES, RETRY_DELAY, response):
+                        return {
+                            "success": False,
+                            "error": f"Research API error: {response.status_code}"
+                        }
                     
-                    else:
-                        error_text = response.text[:500]
-                        logger.error(f"Perplexity API error {response.status_code}: {error_text}")
-                        
-                        if attempt == MAX_RETRIES - 1:  # Last attempt
-                            return {
-                                "success": False,
-                                "error": f"Research API error: {response.status_code}"
-                            }
-                        
-                        await asyncio.sleep(RETRY_DELAY)
-                        
             except httpx.TimeoutException:
-                logger.warning(f"Request timeout on attempt {attempt + 1}")
-                if attempt == MAX_RETRIES - 1:
+                logger.warning("Request timeout on attempt %d", attempt + 1)
+                if not await sleep_or_give_up(attempt, MAX_RETRIES, RETRY_DELAY):
                     return {
                         "success": False,
                         "error": "Request timeout after all retries"
                     }
-                await asyncio.sleep(RETRY_DELAY)
                 
             except Exception as e:
-                logger.error(f"Unexpected error on attempt {attempt + 1}: {str(e)}")
-                if attempt == MAX_RETRIES - 1:
+                logger.error("Unexpected error on attempt %d: %s", attempt + 1, e)
+                if not await sleep_or_give_up(attempt, MAX_RETRIES, RETRY_DELAY):
                     return {
                         "success": False,
                         "error": f"Unexpected error: {str(e)}"
                     }
-                await asyncio.sleep(RETRY_DELAY)
         
         return {
             "success": False,
             "error": "All retry attempts failed"
         }
     
-    async def _extract_sources(self, api_result: Dict[str, Any]) -> List[str]:
+    def _extract_sources(self, api_result: Dict[str, Any]) -> List[str]:
         """
         Extract sources from Perplexity API response.
         
+        Citations may be plain URL strings or objects with a "url" field.
+        
         :param api_result: API response dictionary
-        :return: List of source URLs
+        :return: List of source URLs (at most 20); a list, like the cached result's
         """
-        sources = []
-        try:
-            if "citations" in api_result and api_result["citations"]:
-                sources = [
-                    citation.get("url", "")
-                    for citation in api_result["citations"]
-                    if citation.get("url") and citation["url"].startswith("http")
-                ][:20]  # Limit to 20 sources
-        except Exception as e:
-            logger.warning(f"Failed to extract citations: {str(e)}")
-        
-        return sources
+        urls = (
+            citation if isinstance(citation, str) else citation.get("url") or ""
+            for citation in api_result.get("citations") or ()
+            if isinstance(citation, (str, dict))
+        )
+        return list(islice((url for url in urls if url.startswith(_URL_PREFIXES)), MAX_SOURCES))
     
-    async def _increment_prompt_usage(self, prompt_name: str):
+    def _increment_prompt_usage(self, prompt_name: str):
         """
         Increment usage count for the prompt.
         
+        The increment is buffered and written in batches by prompt_usage_service.
+        
         :param prompt_name: Name of the prompt to update
         """
-        try:
-            from marbix.crud.prompt import get_prompt_by_name
-            
-            prompt = get_prompt_by_name(self.db, prompt_name)
-            if prompt:
-                increment_prompt_usage(self.db, prompt.id)
-                logger.debug(f"Incremented usage for prompt '{prompt_name}'")
-        except Exception as e:
-            logger.warning(f"Failed to increment prompt usage: {str(e)}")
+        prompt_usage_service.record(prompt_name)
+        logger.debug("Recorded usage for prompt '%s'", prompt_name)
+
+
+# Shared agent instance, created on first use
+_agent: Optional[ResearcherAgent] = None
+
+
+def get_researcher_agent() -> ResearcherAgent:
+    """Return the shared researcher agent, creating it on first use."""
+    global _agent
+    if _agent is None:
+        _agent = ResearcherAgent()
+    return _agent
 
 
 # Convenience function for direct usage in ARQ workers
@@ -277,5 +447,4 @@ async def conduct_research_async(
     :param prompt_name: Name of the prompt to use
     :return: Research results
     """
-    agent = ResearcherAgent(db)
-    return await agent.conduct_research(request_data, request_id, prompt_name)
+    return await get_researcher_agent().conduct_research(db, request_data, request_id, prompt_name)
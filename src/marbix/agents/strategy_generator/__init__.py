@@ -8,21 +8,15 @@ from .config import (
     get_model_config
 )
 
-try:
-    from .strategy_agent import (
-        StrategyGeneratorAgent,
-        generate_strategy_async
-    )
-except ImportError:
-    class StrategyGeneratorAgent:
-        def __init__(self, *args, **kwargs):
-            raise ImportError("Strategy generator agent is not available")
-    
-    def generate_strategy_async(*args, **kwargs):
-        raise ImportError("Strategy generator agent is not available")
+from .strategy_agent import (
+    StrategyGeneratorAgent,
+    get_strategy_agent,
+    generate_strategy_async
+)
 
 __all__ = [
     "StrategyGeneratorAgent",
+    "get_strategy_agent",
     "generate_strategy_async",
     "get_anthropic_config",
     "validate_configuration",
@@ -2,27 +2,56 @@
 Configuration for the Strategy Generator Agent using Anthropic Claude API.
 """
 
-from typing import Dict, Any
+import logging
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Any
 from marbix.core.config import settings
 
+logger = logging.getLogger(__name__)
 
-def get_anthropic_config() -> Dict[str, Any]:
+# Settings don't change at runtime, so the config mappings are built once at import
+# and exposed read-only to prevent callers from mutating shared state.
+_ANTHROPIC_CONFIG = MappingProxyType({
+    "model_name": getattr(settings, 'STRATEGY_MODEL_NAME', 'claude-sonnet-4-20250514'),
+    "max_tokens": settings.ANTHROPIC_MAX_TOKENS,
+    "temperature": settings.ANTHROPIC_TEMPERATURE,
+    "api_key": settings.ANTHROPIC_API_KEY,
+    "base_url": "https://api.anthropic.com/v1/messages",
+    "timeout": settings.ANTHROPIC_TIMEOUT_S,
+})
+
+_MODEL_CONFIG = MappingProxyType({
+    "claude-sonnet-4-20250514": MappingProxyType({
+        "max_tokens": 6000,
+        "temperature": 0.3,
+        "anthropic_version": "2023-06-01"
+    }),
+
+    "claude-3-5-haiku-20241022": MappingProxyType({
+        "max_tokens": 4000,
+        "temperature": 0.3,
+        "anthropic_version": "2023-06-01"
+    }),
+    "claude-3-opus-20240229": MappingProxyType({
+        "max_tokens": 8000,
+        "temperature": 0.3,
+        "anthropic_version": "2023-06-01"
+    })
+})
+
+
+def get_anthropic_config() -> Mapping[str, Any]:
     """
     Get Anthropic Claude configuration settings from environment.
     
     Returns:
-        Dictionary with Anthropic configuration
+        Read-only mapping with Anthropic configuration
     """
-    return {
-        "model_name": getattr(settings, 'STRATEGY_MODEL_NAME', 'claude-sonnet-4-20250514'),
-        "max_tokens": getattr(settings, 'STRATEGY_MAX_TOKENS', 6000),
-        "temperature": getattr(settings, 'STRATEGY_TEMPERATURE', 0.3),
-        "api_key": getattr(settings, 'ANTHROPIC_API_KEY', None),
-        "base_url": "https://api.anthropic.com/v1/messages",
-        "timeout": getattr(settings, 'STRATEGY_TIMEOUT', 300),
-    }
+    return _ANTHROPIC_CONFIG
 
 
+@lru_cache(maxsize=1)
 def validate_configuration() -> bool:
     """
     Validate that all required configuration is present.
@@ -30,42 +59,22 @@ def validate_configuration() -> bool:
     Returns:
         True if configuration is valid, False otherwise
     """
-    try:
-        # Check for required environment variables
-        if not getattr(settings, 'ANTHROPIC_API_KEY', None):
-            return False
-        
-        if not getattr(settings, 'DATABASE_URL', None):
-            return False
-        
-        return True
-        
-    except Exception:
+    if not settings.ANTHROPIC_API_KEY:
+        logger.debug("Strategy generator configuration invalid: ANTHROPIC_API_KEY is not set")
         return False
+    
+    if not settings.DATABASE_URL:
+        logger.debug("Strategy generator configuration invalid: DATABASE_URL is not set")
+        return False
+    
+    return True
 
 
-def get_model_config() -> Dict[str, Any]:
+def get_model_config() -> Mapping[str, Any]:
     """
     Get model-specific configuration.
     
     Returns:
-        Dictionary with model configuration
+        Read-only mapping with model configuration
     """
-    return {
-        "claude-sonnet-4-20250514": {
-            "max_tokens": 6000,
-            "temperature": 0.3,
-            "anthropic_version": "2023-06-01"
-        },
-
-        "claude-3-5-haiku-20241022": {
-            "max_tokens": 4000,
-            "temperature": 0.3,
-            "anthropic_version": "2023-06-01"
-        },
-        "claude-3-opus-20240229": {
-            "max_tokens": 8000,
-            "temperature": 0.3,
-            "anthropic_version": "2023-06-01"
-        }
-    }
\ No newline at end of file
+    return _MODEL_CONFIG
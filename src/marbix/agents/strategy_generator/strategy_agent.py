@@ -6,34 +6,69 @@ clear, actionable marketing strategies using Claude Sonnet 4.
 """
 
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 import httpx
 import asyncio
+import orjson
 
 from marbix.utils.prompt_utils import get_formatted_prompt
-from marbix.crud.prompt import increment_prompt_usage, get_prompt_by_name
+from marbix.utils.prompt_cache import make_prompt_cache_key, get_cached_prompt, set_cached_prompt
 from marbix.core.config import settings
+from marbix.services.prompt_usage_service import prompt_usage_service
+from marbix.core.http import get_anthropic_client, ANTHROPIC_SEM
+from marbix.utils.retry import sleep_or_give_up
+from marbix.utils.single_flight import SingleFlight
+from marbix.utils.strategy_cache import make_strategy_cache_key, get_cached_strategy, cache_strategy
 
 logger = logging.getLogger(__name__)
 
+TokenCallback = Callable[[str], Awaitable[None]]
+
+# Anthropic only caches prefixes of at least 1024 tokens; ~4 characters per token
+PROMPT_CACHE_MIN_CHARS = 1024 * 4
+
+# Request fields substituted into the strategy prompt
+_REQUEST_FIELDS = (
+    "business_type",
+    "business_goal",
+    "product_data",
+    "target_audience_info",
+    "location",
+    "company_name",
+    "competitors",
+    "current_volume",
+    "actions",
+    "promotion_budget",
+    "team_budget",
+)
+
+# Strategy requests currently running in this process, keyed by strategy cache key
+_strategy_flight = SingleFlight()
+
+# Max sources listed in the SOURCES block of the strategy request
+MAX_PROMPT_SOURCES = 20
+
+# Statuses worth retrying; 529 is Anthropic's "overloaded"
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504, 529})
+
 
 class StrategyGeneratorAgent:
     """Strategy generator agent using Anthropic Claude API."""
     
-    def __init__(self, db: Session, model_name: str = "claude-sonnet-4-20250514"):
+    def __init__(self, model_name: str = "claude-sonnet-4-20250514"):
         """
         Initialize the strategy generator agent with Anthropic Claude.
         
+        The agent holds no per-request state, so one instance per model is
+        shared by all jobs (see get_strategy_agent).
+        
         Args:
-            db: Database session for retrieving prompts and updating usage
             model_name: Name of the model to use
         """
-        self.db = db
         self.model_name = model_name
         self.api_key = settings.ANTHROPIC_API_KEY
-        self.base_url = "https://api.anthropic.com/v1/messages"
         
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY is required in environment variables")
@@ -42,20 +77,25 @@ class StrategyGeneratorAgent:
     
     async def generate_strategy(
         self,
+        db: Session,
         request_data: Dict[str, Any],
         research_output: Dict[str, Any],
         request_id: str,
         prompt_name: str,
-        system_prompt_override: Optional[str] = None
+        system_prompt_override: Optional[str] = None,
+        on_token: Optional[TokenCallback] = None
     ) -> Dict[str, Any]:
         """
         Generate comprehensive marketing strategy using Claude.
         
         Args:
+            db: Database session for retrieving the prompt
             request_data: Original business request data
             research_output: Output from the researcher agent
             request_id: Unique identifier for the request
             prompt_name: Name of the prompt to retrieve from database
+            system_prompt_override: Prompt to use instead of the database prompt
+            on_token: Optional coroutine called with each text chunk as Claude streams it
             
         Returns:
             Generated strategy with success status and content
@@ -74,18 +114,27 @@ class StrategyGeneratorAgent:
                 strategy_prompt = system_prompt_override
                 logger.info(f"Using system prompt override for {request_id}")
             else:
-                strategy_prompt = self._get_strategy_prompt(prompt_name, request_data, research_output)
+                strategy_prompt = await self._get_strategy_prompt(db, prompt_name, request_data, research_output)
                 if not strategy_prompt:
                     return {
                         "success": False,
                         "error": "Strategy prompt not found in database"
                     }
             
-            # Generate strategy using Claude
-            strategy_content = await self._make_strategy_request(strategy_prompt, research_output)
+            # Reuse the stored strategy for identical inputs (retries, re-runs)
+            cache_key = make_strategy_cache_key(self.model_name, strategy_prompt, research_output)
+            strategy_content = await get_cached_strategy(cache_key)
+            cached = strategy_content is not None
+            if cached:
+                logger.info(f"Using cached strategy for {request_id}")
+                if on_token:
+                    await on_token(strategy_content)
+            else:
+                # Generate strategy using Claude (identical concurrent requests share one call)
+                strategy_content = await self._generate_once(cache_key, strategy_prompt, research_output, on_token)
             
             if strategy_content:
-                await self._increment_prompt_usage(prompt_name)
+                self._increment_prompt_usage(prompt_name)
                 
                 logger.info(f"Strategy generated successfully for {request_id}")
                 
@@ -93,8 +142,9 @@ class StrategyGeneratorAgent:
                     "success": True,
                     "strategy": strategy_content,
                     "model_used": self.model_name,
-                    "generated_at": datetime.now().isoformat(),
-                    "agent_framework": "Custom Anthropic Agent"
+                    "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "agent_framework": "Custom Anthropic Agent",
+                    "cached": cached
                 }
             else:
                 return {
@@ -110,115 +160,227 @@ class StrategyGeneratorAgent:
                 "error": error_msg
             }
     
-    async def _make_strategy_request(self, prompt: str, research_output: Dict[str, Any]) -> Optional[str]:
-        """Make request to Claude API for strategy generation with retry logic."""
-        MAX_RETRIES = 3
-        RETRY_DELAY = 5
+    async def _generate_once(
+        self,
+        cache_key: str,
+        prompt: str,
+        research_output: Dict[str, Any],
+        on_token: Optional[TokenCallback] = None
+    ) -> Optional[str]:
+        """
+        Generate and cache a strategy, coalescing identical in-flight requests.
         
-        for attempt in range(MAX_RETRIES):
-            try:
-                # Prepare the message content
-                message_content = f"""
-{prompt}
-
+        Args:
+            cache_key: Strategy cache key identifying the request
+            prompt: Formatted strategy prompt
+            research_output: Output from the researcher agent
+            on_token: Optional coroutine called with streamed text chunks
+            
+        Returns:
+            Strategy text or None if generation failed
+        """
+        streamed = False
+        
+        async def run() -> Optional[str]:
+            nonlocal streamed
+            streamed = True
+            strategy = await self._make_strategy_request(prompt, research_output, on_token)
+            if strategy:
+                await cache_strategy(cache_key, strategy)
+            return strategy
+        
+        if _strategy_flight.in_flight(cache_key):
+            logger.info("Joining in-flight strategy generation")
+        
+        strategy = await _strategy_flight.do(cache_key, run)
+        # Followers never saw the stream; hand them the whole text at once
+        if strategy and on_token and not streamed:
+            await on_token(strategy)
+        return strategy
+    
+    async def _make_strategy_request(
+        self,
+        prompt: str,
+        research_output: Dict[str, Any],
+        on_token: Optional[TokenCallback] = None
+    ) -> Optional[str]:
+        """Stream a strategy from the Claude API with retry logic."""
+        max_retries = settings.ANTHROPIC_MAX_RETRIES
+        
+        # The research block is the only per-request part of the message
+        # Unique sources in original order, capped to keep input tokens down
+        sources = list(dict.fromkeys(research_output.get('sources') or []))[:MAX_PROMPT_SOURCES]
+        sources_block = "\n".join(sources or ['No sources available'])
+        research_block = f"""
 RESEARCH OUTPUT:
 {research_output.get('research_content', 'No research content available')}
 
 SOURCES:
-{chr(10).join(research_output.get('sources', ['No sources available']))}
+{sources_block}
 
 Please generate a comprehensive marketing strategy based on the above research and prompt.
 """
-                
-                headers = {
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json"
+        
+        # Serialized once; every retry sends the same bytes
+        body = orjson.dumps({
+            "model": self.model_name,
+            "max_tokens": settings.ANTHROPIC_MAX_TOKENS,
+            "temperature": settings.ANTHROPIC_TEMPERATURE,
+            "system": self._build_system_blocks(prompt),
+            "stream": True,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": research_block
                 }
+            ]
+        })
+        
+        client = get_anthropic_client()
+        
+        # Once text has reached on_token a retry would replay it from the start,
+        # so a stream that fails part-way through is not retried
+        emitted = False
+        
+        async def emit(text: str) -> None:
+            nonlocal emitted
+            emitted = True
+            await on_token(text)
+        
+        for attempt in range(max_retries):
+            try:
+                async with ANTHROPIC_SEM:
+                    async with client.stream("POST", "/v1/messages", content=body) as response:
+                        if response.status_code == 200:
+                            strategy = await self._read_stream(response, emit if on_token else None)
+                        else:
+                            await response.aread()
                 
-                payload = {
-                    "model": self.model_name,
-                    "max_tokens": 6000,
-                    "temperature": 0.3,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": message_content
-                        }
-                    ]
-                }
+                if response.status_code == 200:
+                    if strategy:
+                        logger.info(f"Strategy generated successfully on attempt {attempt + 1}")
+                        return strategy
+                    logger.warning("Claude response had no content")
+                    if not await self._retry_wait(attempt):
+                        return None
                 
-                async with httpx.AsyncClient(timeout=300.0) as client:
-                    response = await client.post(
-                        self.base_url,
-                        headers=headers,
-                        json=payload
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        content = result.get("content", [])
-                        
-                        if content and len(content) > 0:
-                            logger.info(f"Strategy generated successfully on attempt {attempt + 1}")
-                            return content[0].get("text", "")
-                        else:
-                            logger.warning("Claude response had no content")
-                            if attempt == MAX_RETRIES - 1:  # Last attempt
-                                return None
-                            continue
-                    
-                    elif response.status_code in [429, 502, 503, 504]:  # Rate limited or server errors
-                        wait_time = min(RETRY_DELAY * (2 ** attempt), 120)
-                        logger.warning(f"Claude API error {response.status_code}, waiting {wait_time}s before retry {attempt + 1}")
-                        await asyncio.sleep(wait_time)
-                        continue
+                elif response.status_code in RETRYABLE_STATUSES:  # Rate limited, overloaded or server errors
+                    logger.warning(f"Claude API error {response.status_code} on attempt {attempt + 1}")
+                    if not await self._retry_wait(attempt, response):
+                        return None
+                
+                else:
+                    # Other 4xx errors won't succeed on retry
+                    logger.error(f"Claude API error {response.status_code}: {response.text[:500]}")
+                    return None
                     
-                    else:
-                        error_text = response.text[:500]
-                        logger.error(f"Claude API error {response.status_code}: {error_text}")
-                        
-                        if attempt == MAX_RETRIES - 1:  # Last attempt
-                            return None
-                        
-                        await asyncio.sleep(RETRY_DELAY)
-                        
             except httpx.TimeoutException:
                 logger.warning(f"Request timeout on attempt {attempt + 1}")
-                if attempt == MAX_RETRIES - 1:
+                if emitted:
+                    logger.error("Stream failed after output was emitted; not retrying")
+                    return None
+                if not await self._retry_wait(attempt):
                     return None
-                await asyncio.sleep(RETRY_DELAY)
                 
             except Exception as e:
                 logger.error(f"Unexpected error on attempt {attempt + 1}: {str(e)}")
-                if attempt == MAX_RETRIES - 1:
+                if emitted:
+                    logger.error("Stream failed after output was emitted; not retrying")
+                    return None
+                if not await self._retry_wait(attempt):
                     return None
-                await asyncio.sleep(RETRY_DELAY)
         
         return None
     
-    def _get_strategy_prompt(self, prompt_name: str, request_data: Dict[str, Any], research_output: Dict[str, Any]) -> Optional[str]:
-        """Retrieve and format strategy prompt from database."""
+    async def _retry_wait(self, attempt: int, response: Optional[httpx.Response] = None) -> bool:
+        """Back off before the next attempt; False once the retry budget is spent."""
+        return await sleep_or_give_up(
+            attempt,
+            settings.ANTHROPIC_MAX_RETRIES,
+            settings.ANTHROPIC_RETRY_BACKOFF_S,
+            response,
+            settings.ANTHROPIC_RETRY_BACKOFF_CAP_S
+        )
+    
+    async def _read_stream(self, response: httpx.Response, on_token: Optional[TokenCallback]) -> str:
+        """
+        Collect the text of a streamed Messages API response.
+        
+        Args:
+            response: Open streaming response with status 200
+            on_token: Optional coroutine called with each text delta
+            
+        Returns:
+            The concatenated text of all content blocks
+        """
+        chunks: List[str] = []
+        usage: Dict[str, Any] = {}
+        
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = orjson.loads(line[5:])
+            event_type = event.get("type")
+            
+            if event_type == "content_block_delta":
+                text = event.get("delta", {}).get("text")
+                if text:
+                    chunks.append(text)
+                    if on_token:
+                        await on_token(text)
+            elif event_type == "message_start":
+                usage.update(event.get("message", {}).get("usage", {}))
+            elif event_type == "message_delta":
+                usage.update(event.get("usage", {}))
+            elif event_type == "error":
+                raise RuntimeError(f"Claude stream error: {event.get('error')}")
+        
+        logger.info(
+            "Claude usage: input=%s output=%s cache_read=%s cache_creation=%s",
+            usage.get("input_tokens"),
+            usage.get("output_tokens"),
+            usage.get("cache_read_input_tokens"),
+            usage.get("cache_creation_input_tokens")
+        )
+        return "".join(chunks)
+    
+    def _build_system_blocks(self, prompt: str) -> List[Dict[str, Any]]:
+        """Put the strategy prompt in a system block, marked cacheable when long enough."""
+        block = {"type": "text", "text": prompt}
+        if len(prompt) >= PROMPT_CACHE_MIN_CHARS:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+    
+    async def _get_strategy_prompt(
+        self,
+        db: Session,
+        prompt_name: str,
+        request_data: Dict[str, Any],
+        research_output: Dict[str, Any]
+    ) -> Optional[str]:
+        """Retrieve and format strategy prompt from database without blocking the event loop."""
         try:
             business_context = {
-                "business_type": request_data.get("business_type", "").strip(),
-                "business_goal": request_data.get("business_goal", "").strip(),
-                "product_data": request_data.get("product_data", "").strip(),
-                "target_audience_info": request_data.get("target_audience_info", "").strip(),
-                "location": request_data.get("location", "").strip(),
-                "company_name": request_data.get("company_name", "").strip(),
-                "competitors": request_data.get("competitors", "").strip(),
-                "current_volume": request_data.get("current_volume", "").strip(),
-                "actions": request_data.get("actions", "").strip(),
-                "promotion_budget": request_data.get("promotion_budget", "").strip(),
-                "team_budget": request_data.get("team_budget", "").strip(),
-                "research_content": research_output.get("research_content", ""),
-                "research_sources_count": len(research_output.get("sources", [])),
-                "research_model_used": research_output.get("model_used", ""),
-                "citations": self._format_citations(research_output.get("sources", []))
+                field: (request_data.get(field) or "").strip()
+                for field in _REQUEST_FIELDS
             }
+            sources = research_output.get("sources", [])
+            business_context.update(
+                research_content=research_output.get("research_content", ""),
+                research_sources_count=len(sources),
+                research_model_used=research_output.get("model_used", ""),
+                citations=self._format_citations(sources)
+            )
             
-            prompt = get_formatted_prompt(self.db, prompt_name, **business_context)
+            cache_key = make_prompt_cache_key(prompt_name, business_context)
+            prompt = get_cached_prompt(cache_key)
+            if prompt:
+                logger.info(f"Using cached strategy prompt '{prompt_name}'")
+                return prompt
+            
+            prompt = await asyncio.to_thread(get_formatted_prompt, db, prompt_name, **business_context)
+            if prompt:
+                set_cached_prompt(cache_key, prompt)
             return prompt
             
         except Exception as e:
@@ -227,13 +389,7 @@ Please generate a comprehensive marketing strategy based on the above research a
     
     def _validate_research_output(self, research_output: Dict[str, Any]) -> bool:
         """Validate that research output contains required fields."""
-        if not research_output.get("success"):
-            return False
-        
-        if not research_output.get("research_content"):
-            return False
-        
-        return True
+        return bool(research_output.get("success") and research_output.get("research_content"))
     
     def _format_citations(self, sources: List[str]) -> str:
         """Format sources list into a readable citations string."""
@@ -256,15 +412,30 @@ Please generate a comprehensive marketing strategy based on the above research a
             logger.warning(f"Failed to format citations: {str(e)}")
             return "Error formatting sources"
     
-    async def _increment_prompt_usage(self, prompt_name: str):
-        """Increment usage count for the strategy prompt."""
-        try:
-            prompt = get_prompt_by_name(self.db, prompt_name)
-            if prompt:
-                increment_prompt_usage(self.db, prompt.id)
-                logger.debug(f"Incremented usage for strategy prompt '{prompt_name}'")
-        except Exception as e:
-            logger.warning(f"Failed to increment strategy prompt usage: {str(e)}")
+    def _increment_prompt_usage(self, prompt_name: str):
+        """Record a use of the strategy prompt; written in batches by prompt_usage_service."""
+        prompt_usage_service.record(prompt_name)
+        logger.debug(f"Recorded usage for strategy prompt '{prompt_name}'")
+
+
+# One agent per model, shared by all jobs in the process
+_AGENTS: Dict[str, StrategyGeneratorAgent] = {}
+
+
+def get_strategy_agent(model_name: str = "claude-sonnet-4-20250514") -> StrategyGeneratorAgent:
+    """
+    Return the shared strategy agent for a model, creating it on first use.
+    
+    Args:
+        model_name: Name of the model to use
+        
+    Returns:
+        Strategy generator agent for the model
+    """
+    agent = _AGENTS.get(model_name)
+    if agent is None:
+        agent = _AGENTS[model_name] = StrategyGeneratorAgent(model_name)
+    return agent
 
 
 async def generate_strategy_async(
@@ -274,7 +445,8 @@ async def generate_strategy_async(
     request_id: str,
     prompt_name: str,
     model_name: str = "claude-sonnet-4-20250514",
-    system_prompt_override: Optional[str] = None
+    system_prompt_override: Optional[str] = None,
+    on_token: Optional[TokenCallback] = None
 ) -> Dict[str, Any]:
     """
     Convenience function for generating strategies asynchronously using Claude.
@@ -286,9 +458,12 @@ async def generate_strategy_async(
         request_id: Request identifier
         prompt_name: Name of the strategy prompt to use
         model_name: Name of the model to use
+        system_prompt_override: Prompt to use instead of the database prompt
+        on_token: Optional coroutine called with each streamed text chunk
         
     Returns:
         Generated strategy results
     """
-    agent = StrategyGeneratorAgent(db, model_name)
-    return await agent.generate_strategy(request_data, research_output, request_id, prompt_name, system_prompt_override)
\ No newline at end of file
+    return await get_strategy_agent(model_name).generate_strategy(
+        db, request_data, research_output, request_id, prompt_name, system_prompt_override, on_token
+    )
\ No newline at end of file
@@ -1,15 +1,19 @@
+import importlib
 import os
+import pkgutil
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 
-# 1) Import your Base and all models so metadata is populated
+# 1) Import your Base and every module in marbix.models so metadata is populated
+#    (new model modules are picked up without editing this file)
 from marbix.db.base import Base
-import marbix.models.user  # add any additional model modules here
-import marbix.models.make_request  # add any additional model modules here
-import marbix.models.prompt  # import prompt model so Alembic can detect it
-import marbix.models.enhanced_strategy  # import enhanced strategy model
+import marbix.models
+
+for _module in sorted(m.name for m in pkgutil.iter_modules(marbix.models.__path__)):
+    importlib.import_module(f"marbix.models.{_module}")
+
 # 2) Alembic Config object, provides access to values from alembic.ini
 config = context.config
 
@@ -41,13 +45,35 @@ def run_migrations_offline():
         context.run_migrations()
 
 
+# Engines by URL, so re-entering env.py in the same process reuses connections
+_ENGINES = {}
+
+
+def get_engine():
+    """Return a pooled engine for the configured URL (NullPool if ALEMBIC_NO_POOL is set)."""
+    url = config.get_main_option("sqlalchemy.url")
+    engine = _ENGINES.get(url)
+    if engine is None:
+        if os.getenv("ALEMBIC_NO_POOL"):
+            pool_kwargs = {"poolclass": pool.NullPool}
+        else:
+            pool_kwargs = {
+                "poolclass": pool.QueuePool,
+                "pool_size": 5,
+                "max_overflow": 10,
+                "pool_pre_ping": True,
+            }
+        engine = _ENGINES[url] = engine_from_config(
+            config.get_section(config.config_ini_section),
+            prefix="sqlalchemy.",
+            **pool_kwargs,
+        )
+    return engine
+
+
 def run_migrations_online():
     """Run migrations in 'online' mode (with real DB connection)."""
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    connectable = get_engine()
 
     with connectable.connect() as connection:
         context.configure(
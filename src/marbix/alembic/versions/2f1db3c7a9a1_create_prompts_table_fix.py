@@ -21,18 +21,31 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# Indexes on prompts, in creation order
+_INDEXES = (
+    ('ix_prompts_name', 'name'),
+    ('ix_prompts_category', 'category'),
+    ('ix_prompts_created_by', 'created_by'),
+    ('ix_prompts_parent_id', 'parent_id'),
+)
+
+
+def _existing_objects(conn):
+    """Probe the table and all its indexes in one round-trip; returns (table_exists, {index: exists})."""
+    probes = ", ".join(
+        f"to_regclass('public.{name}') IS NOT NULL" for name in ('prompts',) + tuple(ix for ix, _ in _INDEXES)
+    )
+    row = conn.execute(sa.text(f"SELECT {probes}")).one()
+    return row[0], {ix: exists for (ix, _), exists in zip(_INDEXES, row[1:])}
+
+
 def upgrade() -> None:
     """Create prompts table and indexes if they don't exist."""
     # Create table only if not exists (PostgreSQL doesn't support IF NOT EXISTS for CREATE TABLE
-    # via Alembic Op, so we guard by checking information_schema using raw SQL)
-    conn = op.get_bind()
-    exists = conn.execute(sa.text(
-        """
-        SELECT to_regclass('public.prompts') IS NOT NULL AS exists
-        """
-    )).scalar()
-
-    if not exists:
+    # via Alembic Op, so we guard by checking to_regclass using raw SQL)
+    table_exists, index_exists = _existing_objects(op.get_bind())
+
+    if not table_exists:
         op.create_table(
             'prompts',
             sa.Column('id', sa.String(), primary_key=True, nullable=False),
@@ -51,26 +64,23 @@ def upgrade() -> None:
             sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         )
 
-        op.create_index('ix_prompts_name', 'prompts', ['name'], unique=False)
-        op.create_index('ix_prompts_category', 'prompts', ['category'], unique=False)
-        op.create_index('ix_prompts_created_by', 'prompts', ['created_by'], unique=False)
-        op.create_index('ix_prompts_parent_id', 'prompts', ['parent_id'], unique=False)
+    # The table may already hold data here, so build indexes without blocking writes.
+    # CONCURRENTLY can't run inside a transaction, hence autocommit_block.
+    missing = [(ix, column) for ix, column in _INDEXES if not index_exists[ix]]
+    if missing:
+        with op.get_context().autocommit_block():
+            for index_name, column in missing:
+                op.execute(sa.text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON prompts ({column})'))
 
 
 def downgrade() -> None:
     """Drop prompts table and indexes if they exist."""
-    conn = op.get_bind()
-    exists = conn.execute(sa.text(
-        """
-        SELECT to_regclass('public.prompts') IS NOT NULL AS exists
-        """
-    )).scalar()
-
-    if exists:
-        op.drop_index('ix_prompts_parent_id', table_name='prompts')
-        op.drop_index('ix_prompts_created_by', table_name='prompts')
-        op.drop_index('ix_prompts_category', table_name='prompts')
-        op.drop_index('ix_prompts_name', table_name='prompts')
-        op.drop_table('prompts')
-
+    table_exists, index_exists = _existing_objects(op.get_bind())
 
+    if table_exists:
+        existing = [ix for ix, _ in reversed(_INDEXES) if index_exists[ix]]
+        if existing:
+            with op.get_context().autocommit_block():
+                for index_name in existing:
+                    op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}'))
+        op.drop_table('prompts')
@@ -0,0 +1,36 @@
+"""add make_requests (user_id, created_at) index
+
+Revision ID: 7c4e2a9d1f30
+Revises: 63bdcacae205
+Create Date: 2026-10-15 12:00:00.000000
+
+Serves the per-user strategy listings (WHERE user_id = ? ORDER BY created_at DESC
+LIMIT n) straight from the index instead of filtering and sorting every row.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2a9d1f30'
+down_revision: Union[str, Sequence[str], None] = '63bdcacae205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction, hence autocommit_block
+    with op.get_context().autocommit_block():
+        op.execute(sa.text(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_make_requests_user_id_created_at '
+            'ON make_requests (user_id, created_at DESC)'
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(sa.text('DROP INDEX CONCURRENTLY IF EXISTS ix_make_requests_user_id_created_at'))
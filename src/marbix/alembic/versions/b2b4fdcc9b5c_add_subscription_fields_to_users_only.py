@@ -21,49 +21,46 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.alter_column('prompts', 'created_at',
-               existing_type=postgresql.TIMESTAMP(timezone=True),
-               type_=sa.DateTime(),
-               existing_nullable=False,
-               existing_server_default=sa.text('now()'))
-    op.alter_column('prompts', 'updated_at',
-               existing_type=postgresql.TIMESTAMP(timezone=True),
-               type_=sa.DateTime(),
-               existing_nullable=False,
-               existing_server_default=sa.text('now()'))
+    # Both type changes in one ALTER TABLE: one lock and one table rewrite instead of two
+    op.execute(sa.text(
+        "ALTER TABLE prompts "
+        "ALTER COLUMN created_at TYPE TIMESTAMP WITHOUT TIME ZONE, "
+        "ALTER COLUMN updated_at TYPE TIMESTAMP WITHOUT TIME ZONE"
+    ))
     op.create_index(op.f('ix_prompts_id'), 'prompts', ['id'], unique=False)
     
     # Create the enum type first
     subscription_status_enum = postgresql.ENUM('FREE', 'PENDING_PRO', 'PRO', name='subscriptionstatus')
     subscription_status_enum.create(op.get_bind())
     
-    # Now add the columns
-    op.add_column('users', sa.Column('subscription_status', subscription_status_enum, nullable=False, server_default='FREE'))
-    op.add_column('users', sa.Column('subscription_updated_at', sa.DateTime(), nullable=True))
-    op.add_column('users', sa.Column('subscription_granted_by', sa.String(), nullable=True))
+    # Now add the columns, in a single ALTER TABLE
+    op.execute(sa.text(
+        "ALTER TABLE users "
+        "ADD COLUMN subscription_status subscriptionstatus NOT NULL DEFAULT 'FREE', "
+        "ADD COLUMN subscription_updated_at TIMESTAMP WITHOUT TIME ZONE, "
+        "ADD COLUMN subscription_granted_by VARCHAR"
+    ))
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_column('users', 'subscription_granted_by')
-    op.drop_column('users', 'subscription_updated_at')
-    op.drop_column('users', 'subscription_status')
+    op.execute(sa.text(
+        "ALTER TABLE users "
+        "DROP COLUMN subscription_granted_by, "
+        "DROP COLUMN subscription_updated_at, "
+        "DROP COLUMN subscription_status"
+    ))
     
     # Drop the enum type
     subscription_status_enum = postgresql.ENUM('FREE', 'PENDING_PRO', 'PRO', name='subscriptionstatus')
     subscription_status_enum.drop(op.get_bind())
     
     op.drop_index(op.f('ix_prompts_id'), table_name='prompts')
-    op.alter_column('prompts', 'updated_at',
-               existing_type=sa.DateTime(),
-               type_=postgresql.TIMESTAMP(timezone=True),
-               existing_nullable=False,
-               existing_server_default=sa.text('now()'))
-    op.alter_column('prompts', 'created_at',
-               existing_type=sa.DateTime(),
-               type_=postgresql.TIMESTAMP(timezone=True),
-               existing_nullable=False,
-               existing_server_default=sa.text('now()'))
+    op.execute(sa.text(
+        "ALTER TABLE prompts "
+        "ALTER COLUMN updated_at TYPE TIMESTAMP WITH TIME ZONE, "
+        "ALTER COLUMN created_at TYPE TIMESTAMP WITH TIME ZONE"
+    ))
     # ### end Alembic commands ###
@@ -22,6 +22,15 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# Indexes on prompts, in creation order
+_INDEXES = (
+    ('ix_prompts_name', 'name'),
+    ('ix_prompts_category', 'category'),
+    ('ix_prompts_created_by', 'created_by'),
+    ('ix_prompts_parent_id', 'parent_id'),
+)
+
+
 def upgrade() -> None:
     """Upgrade schema: create prompts table and indexes."""
     op.create_table(
@@ -42,17 +51,16 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
     )
 
-    # Additional indexes
-    op.create_index('ix_prompts_name', 'prompts', ['name'], unique=False)
-    op.create_index('ix_prompts_category', 'prompts', ['category'], unique=False)
-    op.create_index('ix_prompts_created_by', 'prompts', ['created_by'], unique=False)
-    op.create_index('ix_prompts_parent_id', 'prompts', ['parent_id'], unique=False)
+    # Additional indexes; CONCURRENTLY can't run inside a transaction, hence autocommit_block.
+    # IF NOT EXISTS because index=True above already creates the name/category ones.
+    with op.get_context().autocommit_block():
+        for index_name, column in _INDEXES:
+            op.execute(sa.text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON prompts ({column})'))
 
 
 def downgrade() -> None:
     """Downgrade schema: drop prompts table and indexes."""
-    op.drop_index('ix_prompts_parent_id', table_name='prompts')
-    op.drop_index('ix_prompts_created_by', table_name='prompts')
-    op.drop_index('ix_prompts_category', table_name='prompts')
-    op.drop_index('ix_prompts_name', table_name='prompts')
+    with op.get_context().autocommit_block():
+        for index_name, _ in reversed(_INDEXES):
+            op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}'))
     op.drop_table('prompts')
@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 from marbix.schemas.login import AdminLoginRequest, AdminLoginResponse
-from marbix.core.deps import get_db, get_current_admin
+from marbix.core.deps import get_admin_db, get_current_admin
+from marbix.core.responses import OrjsonResponse
 from marbix.services import admin_service
 from marbix.models.user import User, SubscriptionStatus
 from marbix.schemas.strategy import StrategyItem
-from marbix.schemas.user import UserOut, SubscriptionStatusEnum, UserOutComment
+from marbix.schemas.user import (
+    UserOutAdmin, SubscriptionStatusEnum, UserOutComment,
+    SUBSCRIPTION_STATUS_TO_SCHEMA, SUBSCRIPTION_STATUS_FROM_SCHEMA
+)
 from typing import List, Optional
 from marbix.models.make_request import MakeRequest
 from marbix.schemas.admin import AdminStatsResponse, UserSubscriptionManagement, SubscriptionManagementResponse, AdminCommentRequest
 from datetime import datetime
-router = APIRouter()
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+router = APIRouter(default_response_class=OrjsonResponse)
 
 
 @router.post("/login", response_model=AdminLoginResponse)
-def login_admin(data: AdminLoginRequest, db: Session = Depends(get_db)):
+def login_admin(data: AdminLoginRequest, db: Session = Depends(get_admin_db)):
     token = admin_service.authenticate_admin(data.email, data.password, db)
     return {"access_token": token}
 
@@ -22,53 +28,104 @@ def login_admin(data: AdminLoginRequest, db: Session = Depends(get_db)):
 @router.get("/users", response_model=List[UserOutAdmin])
 def get_all_users(
     subscription_status: Optional[SubscriptionStatusEnum] = Query(None, description="Filter users by subscription status"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; all users when omitted"),
     admin: User = Depends(get_current_admin), 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_admin_db)
 ):
-    return admin_service.get_all_users(db, subscription_status)
+    return admin_service.get_all_users(db, subscription_status, skip, limit)
 
 
 @router.get("/users/{user_id}", response_model=UserOutAdmin)
-def get_user_by_id(user_id: str, admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
+def get_user_by_id(user_id: str, admin: User = Depends(get_current_admin), db: Session = Depends(get_admin_db)):
     return admin_service.get_user_by_id(user_id, db)
 
 
+def _request_field(name: str, default: Optional[str] = None):
+    """Project one request_data field as text in SQL, labelled with its StrategyItem name."""
+    value = MakeRequest.request_data[name].as_string()
+    if default is not None:
+        value = func.coalesce(value, default)
+    return value.label(name)
+
+
+# Columns StrategyItem needs; request_data fields are extracted by Postgres
+_STRATEGY_ITEM_COLUMNS = (
+    MakeRequest.request_id,
+    _request_field("business_type", ""),
+    _request_field("business_goal", ""),
+    _request_field("location", ""),
+    _request_field("promotion_budget"),
+    _request_field("team_budget"),
+    _request_field("current_volume", ""),
+    _request_field("product_data", ""),
+    _request_field("target_audience_info", ""),
+    _request_field("competitors"),
+    _request_field("actions"),
+    MakeRequest.status,
+    MakeRequest.created_at,
+    MakeRequest.completed_at,
+    func.coalesce(MakeRequest.result, "").label("result"),
+    MakeRequest.sources,
+)
+
+
+def _encode_cursor(created_at: datetime, request_id: str) -> str:
+    return urlsafe_b64encode(f"{created_at.isoformat()}|{request_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, request_id = urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), request_id
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
 @router.get("/users/{user_id}/strategies", response_model=List[StrategyItem])
-def get_user_strategies(user_id: str, admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
-    strategies = db.query(MakeRequest).filter(MakeRequest.user_id == user_id).order_by(MakeRequest.created_at.desc()).all()
+def get_user_strategies(
+    user_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_admin_db)
+):
+    """
+    Returns a page of the user's strategies, newest first.
+    The cursor for the next page is sent in the X-Next-Cursor header.
+    """
+    query = select(*_STRATEGY_ITEM_COLUMNS).where(MakeRequest.user_id == user_id)
+    if cursor:
+        query = query.where(tuple_(MakeRequest.created_at, MakeRequest.request_id) < _decode_cursor(cursor))
+    rows = db.execute(
+        query
+        .order_by(MakeRequest.created_at.desc(), MakeRequest.request_id.desc())
+        .limit(limit + 1)
+    ).mappings().all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last["created_at"], last["request_id"])
+
     return [
-        StrategyItem(
-            request_id=s.request_id,
-            business_type=(s.request_data or {}).get("business_type", ""),
-            business_goal=(s.request_data or {}).get("business_goal", ""),
-            location=(s.request_data or {}).get("location", ""),
-            promotion_budget=(s.request_data or {}).get("promotion_budget"),
-            team_budget=(s.request_data or {}).get("team_budget"),
-            current_volume=(s.request_data or {}).get("current_volume", ""),
-            product_data=(s.request_data or {}).get("product_data", ""),
-            target_audience_info=(s.request_data or {}).get("target_audience_info", ""),
-            competitors=(s.request_data or {}).get("competitors"),
-            actions=(s.request_data or {}).get("actions"),
-            status=s.status,
-            created_at=s.created_at,
-            completed_at=s.completed_at,
-            result=s.result or "",
-            sources=s.sources or None
-        )
-        for s in strategies
+        StrategyItem(**{**row, "sources": row["sources"] or None})
+        for row in rows
     ]
 
 
 @router.get("/statistics", response_model=AdminStatsResponse)
-def get_admin_statistics(admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
+def get_admin_statistics(response: Response, admin: User = Depends(get_current_admin), db: Session = Depends(get_admin_db)):
     """
     Returns admin dashboard statistics including user count, strategy counts by status.
     """
-    return admin_service.get_admin_statistics(db)
+    response.headers["Cache-Control"] = f"private, max-age={admin_service.STATISTICS_CACHE_TTL}"
+    return admin_service.get_admin_statistics_cached(db)
 
 
 @router.get("/users/pending-subscriptions", response_model=List[UserOutAdmin])
-def get_pending_subscriptions(admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
+def get_pending_subscriptions(admin: User = Depends(get_current_admin), db: Session = Depends(get_admin_db)):
     """
     Get all users with pending PRO subscription requests.
     """
@@ -80,7 +137,7 @@ def update_user_subscription(
     user_id: str,
     subscription_data: UserSubscriptionManagement,
     admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_admin_db)
 ):
     """
     Update a user's subscription status.
@@ -92,29 +149,30 @@ def update_user_subscription(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Store old status for response
-    old_status_mapping = {
-        SubscriptionStatus.FREE: SubscriptionStatusEnum.FREE,
-        SubscriptionStatus.PENDING_PRO: SubscriptionStatusEnum.PENDING_PRO,
-        SubscriptionStatus.PRO: SubscriptionStatusEnum.PRO
-    }
-    old_status = old_status_mapping[target_user.subscription_status]
+    old_status = SUBSCRIPTION_STATUS_TO_SCHEMA[target_user.subscription_status]
     
     # Convert SubscriptionStatusEnum to SubscriptionStatus
-    status_mapping = {
-        SubscriptionStatusEnum.FREE: SubscriptionStatus.FREE,
-        SubscriptionStatusEnum.PENDING_PRO: SubscriptionStatus.PENDING_PRO,
-        SubscriptionStatusEnum.PRO: SubscriptionStatus.PRO
-    }
+    new_subscription_status = SUBSCRIPTION_STATUS_FROM_SCHEMA[subscription_data.subscription_status]
     
-    new_subscription_status = status_mapping[subscription_data.subscription_status]
+    # Nothing to write if the status is unchanged
+    if target_user.subscription_status == new_subscription_status:
+        return SubscriptionManagementResponse(
+            success=True,
+            message=f"User subscription is already {old_status.value}",
+            user_id=user_id,
+            old_status=old_status,
+            new_status=old_status,
+            updated_at=target_user.subscription_updated_at or target_user.created_at,
+            updated_by=target_user.subscription_granted_by or admin.id
+        )
     
-    # Update the subscription
+    # Update the subscription; the values are known, so no refresh is needed after commit
+    updated_at = datetime.utcnow()
     target_user.subscription_status = new_subscription_status
-    target_user.subscription_updated_at = datetime.utcnow()
+    target_user.subscription_updated_at = updated_at
     target_user.subscription_granted_by = admin.id
     
     db.commit()
-    db.refresh(target_user)
     
     return SubscriptionManagementResponse(
         success=True,
@@ -122,7 +180,7 @@ def update_user_subscription(
         user_id=user_id,
         old_status=old_status,
         new_status=subscription_data.subscription_status,
-        updated_at=target_user.subscription_updated_at,
+        updated_at=updated_at,
         updated_by=admin.id
     )
 
@@ -131,7 +189,7 @@ def update_user_subscription(
 def revoke_user_subscription(
     user_id: str,
     admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_admin_db)
 ):
     """
     Revoke a user's PRO subscription (set back to FREE).
@@ -146,20 +204,15 @@ def revoke_user_subscription(
             detail="User already has FREE subscription"
         )
     
-    old_status_mapping = {
-        SubscriptionStatus.FREE: SubscriptionStatusEnum.FREE,
-        SubscriptionStatus.PENDING_PRO: SubscriptionStatusEnum.PENDING_PRO,
-        SubscriptionStatus.PRO: SubscriptionStatusEnum.PRO
-    }
-    old_status = old_status_mapping[target_user.subscription_status]
+    old_status = SUBSCRIPTION_STATUS_TO_SCHEMA[target_user.subscription_status]
     
     # Revoke subscription
+    updated_at = datetime.utcnow()
     target_user.subscription_status = SubscriptionStatus.FREE
-    target_user.subscription_updated_at = datetime.utcnow()
+    target_user.subscription_updated_at = updated_at
     target_user.subscription_granted_by = admin.id
     
     db.commit()
-    db.refresh(target_user)
     
     return SubscriptionManagementResponse(
         success=True,
@@ -167,7 +220,7 @@ def revoke_user_subscription(
         user_id=user_id,
         old_status=old_status,
         new_status=SubscriptionStatusEnum.FREE,
-        updated_at=target_user.subscription_updated_at,
+        updated_at=updated_at,
         updated_by=admin.id
     )
 
@@ -175,7 +228,7 @@ def revoke_user_subscription(
 def upsert_admin_comment(
     payload: AdminCommentRequest,
     admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_admin_db),
 ):
     # Find the user
     user = db.query(User).filter(User.id == payload.user_id).first()
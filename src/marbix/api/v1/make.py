@@ -1,14 +1,16 @@
 # src/marbix/api/v1/make.py
 from fastapi import APIRouter, HTTPException, Depends, WebSocket, Request
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 import asyncio
 import logging
-import json
-from arq import create_pool
+import orjson
+from arq.connections import ArqRedis
 from marbix.core.deps import get_current_user, get_db
+from marbix.core.redis import get_arq_pool
+from marbix.core.responses import OrjsonResponse
 from marbix.core.config import settings
-from marbix.services.content_filter_service import content_filter_service
-from marbix.core.websocket import manager
+from marbix.core.websocket import manager, send_json
 from marbix.schemas.make_integration import (
    MakeWebhookRequest,
    MakeCallbackResponse,
@@ -24,13 +26,29 @@ import uuid
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=OrjsonResponse)
+
+# Callbacks can arrive in bursts; queue them here rather than at the connection pool,
+# leaving a few connections for everything else. Only wrap DB work that runs in a
+# thread (asyncio.to_thread) - blocking calls on the loop never contend for it.
+_CALLBACK_DB_SEM = asyncio.Semaphore(max(1, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - 5))
+
+# Initial WebSocket frame for a request that is still processing
+_PROCESSING_STATUS_TEMPLATE = (
+    '{"request_id":"%s","type":"status_update","status":"processing",'
+    '"message":"Current status: processing","progress":0.1,"timestamp":"%s"}'
+)
+
+# WebSocket status polling, in seconds; failed lookups back off up to the max
+_WS_POLL_INTERVAL = 2
+_WS_POLL_MAX_INTERVAL = 30
 
 @router.post("/strategy", response_model=ProcessingStatus)
 async def process_request(
        request: MakeWebhookRequest,
        current_user: User = Depends(get_current_user),
-       db: Session = Depends(get_db)
+       db: Session = Depends(get_db),
+       arq_pool: ArqRedis = Depends(get_arq_pool)
 ):
    """NEW FLOW: Initiate processing with immediate WebSocket connection and real-time updates"""
 
@@ -97,62 +115,36 @@ async def process_request(
                error="Strategy already in progress"
            )
 
-       # 2. CONTENT FILTERING - Check business data
-       filter_result = await content_filter_service.check_business_request(request.dict())
-
-       # 2. Handle filter service errors gracefully
-       if not filter_result.get("success", False):
-           logger.warning(f"Content filter service error: {filter_result.get('error', 'Unknown error')}")
-           return ProcessingStatus(
-               request_id="",
-               status="rejected",
-               message="Content filtering service temporarily unavailable. Please try again later.",
-               created_at=datetime.utcnow()
-           )
-
-       # 3. If content is not allowed, return rejection message
-       if not filter_result["is_allowed"]:
-           logger.info(
-               f"Content rejected for user {current_user.id}. "
-               f"Violated topics: {filter_result['violated_topics']}, "
-               f"Reason: {filter_result['reason']}"
-           )
-
-           return ProcessingStatus(
-               request_id="",
-               status="rejected",
-               message="Your business request contains content that cannot be processed according to our platform policies. Please review and modify your business description.",
-               created_at=datetime.utcnow(),
-               error=f"Policy violation: {filter_result['reason']}"
-           )
-
-       # 4. CONTENT APPROVED - Update user number
-       logger.info(f"Content approved for user {current_user.id}. Proceeding with strategy generation.")
+       # 2. Update user number. Content filtering runs in the worker as the first step
+       # of generate_strategy; a rejection arrives as status "rejected" over WebSocket/status.
+       request_data = request.model_dump()
 
-       current_user.number = request.user_number
-       db.add(current_user)
-       db.commit()
-       db.refresh(current_user)
+       # Committed together with the request record below
+       db.execute(
+           update(User)
+           .where(User.id == current_user.id)
+           .values(number=request.user_number)
+       )
 
-       # 5. Generate unique request ID and create database record
+       # 3. Generate unique request ID and create database record
        request_id = str(uuid.uuid4())
 
        # Create initial request record with status "requested"
        status = await make_service.create_request_record(
            request_id=request_id,
            user_id=current_user.id,
-           request_data=request.dict(),
+           request_data=request_data,
            db=db,
            initial_status="requested"  # NEW: Start with "requested" status
        )
 
-       # 6. NEW: Immediately notify via WebSocket that request was created
+       # 4. NEW: Immediately notify via WebSocket that request was created
        try:
            await manager.send_message(request_id, {
                "request_id": request_id,
                "type": "status_update",
                "status": "requested",
-               "message": "Strategy request received and approved. Preparing to start processing...",
+               "message": "Strategy request received. Preparing to start processing...",
                "progress": 0.0,
                "timestamp": datetime.utcnow().isoformat()
            })
@@ -160,10 +152,8 @@ async def process_request(
        except Exception as ws_error:
            logger.warning(f"Failed to send initial WebSocket notification: {str(ws_error)}")
 
-       # 7. Queue job with ARQ worker
+       # 5. Queue job with ARQ worker
        try:
-           redis_pool = await create_pool(settings.redis_settings)
-
            # Update status to "processing" before queuing
            make_service.update_request_status(
                request_id=request_id,
@@ -181,11 +171,11 @@ async def process_request(
                "timestamp": datetime.utcnow().isoformat()
            })
 
-           job = await redis_pool.enqueue_job(
+           job = await arq_pool.enqueue_job(
                'generate_strategy',
                request_id=request_id,
                user_id=current_user.id,
-               request_data=request.dict(),
+               request_data=request_data,
                _job_timeout=settings.ARQ_JOB_TIMEOUT,
                _max_tries=settings.ARQ_MAX_TRIES,
                _defer_by=0  # Start immediately
@@ -222,7 +212,7 @@ async def process_request(
                error=str(redis_error)
            )
 
-       # 8. NEW: Return immediately with request_id for WebSocket connection
+       # 6. NEW: Return immediately with request_id for WebSocket connection
        return ProcessingStatus(
            request_id=request_id,
            status="processing",
@@ -250,42 +240,39 @@ async def handle_callback(
    """Legacy callback handler for backward compatibility"""
    logger.info(f"Received legacy callback for request_id: {request_id}")
 
+   if await make_service.is_unknown_request(request_id):
+       raise HTTPException(status_code=404, detail="Request not found")
+
+   # Reject oversized payloads before (or right after) buffering them
+   content_length = request.headers.get("content-length")
+   if content_length and content_length.isdigit() and int(content_length) > settings.MAX_CALLBACK_BYTES:
+       raise HTTPException(status_code=413, detail="Callback payload too large")
+   raw = await request.body()
+   if len(raw) > settings.MAX_CALLBACK_BYTES:
+       raise HTTPException(status_code=413, detail="Callback payload too large")
+
    try:
        content_type = request.headers.get("content-type", "")
+       status = "completed"
+       error = None
+       data = None
 
+       # Parse the buffered body once; fall back to treating it as plain text
        if "application/json" in content_type:
            try:
-               data = await request.json()
-               if isinstance(data, dict):
-                   result = data.get("result", "")
-                   status = data.get("status", "completed")
-                   error = data.get("error", None)
-               else:
-                   result = str(data)
-                   status = "completed"
-                   error = None
-           except Exception as e:
+               data = orjson.loads(raw)
+           except orjson.JSONDecodeError as e:
                logger.error(f"JSON parse error: {e}")
-               body = await request.body()
-               result = body.decode("utf-8", errors="ignore")
-               status = "completed"
-               error = None
-       else:
-           body = await request.body()
-           result = body.decode("utf-8", errors="ignore")
-           status = "completed"
-           error = None
 
-       # Update request status
-       make_service.update_request_status(
-           request_id=request_id,
-           result=result,
-           status=status,
-           error=error,
-           db=db
-       )
+       if isinstance(data, dict):
+           result = data.get("result", "")
+           status = data.get("status", "completed")
+           error = data.get("error", None)
+       elif data is not None:
+           result = str(data)
+       else:
+           result = raw.decode("utf-8", errors="ignore")
 
-       # Send result through WebSocket
        message = WebSocketMessage(
            request_id=request_id,
            status=status,
@@ -293,7 +280,27 @@ async def handle_callback(
            error=error
        )
 
-       await manager.send_message(request_id, message.dict())
+       async def persist():
+           async with _CALLBACK_DB_SEM:
+               await asyncio.to_thread(
+                   make_service.update_request_status,
+                   request_id=request_id,
+                   result=result,
+                   status=status,
+                   error=error,
+                   db=db
+               )
+           await make_service.invalidate_request_status(request_id)
+
+       # Save the result and push it to the WebSocket concurrently; the client
+       # already has the payload and doesn't need to wait for the commit
+       websocket = manager.active_connections.get(request_id)
+       _, delivered = await asyncio.gather(
+           persist(),
+           manager.send_message(request_id, message.model_dump())
+       )
+       if delivered and status in ("completed", "failed", "error"):
+           manager.complete(request_id, websocket)
 
        return {"status": "ok", "message": "Legacy callback processed"}
 
@@ -307,11 +314,10 @@ async def handle_callback(
 @router.get("/status/{request_id}", response_model=ProcessingStatus)
 async def get_status(
        request_id: str,
-       current_user: User = Depends(get_current_user),
-       db: Session = Depends(get_db)
+       current_user: User = Depends(get_current_user)
 ):
    """Get status of a request (fallback for WebSocket)"""
-   status = make_service.get_request_status(request_id, db)
+   status = await make_service.fetch_request_status(request_id)
 
    if not status:
        raise HTTPException(status_code=404, detail="Request not found")
@@ -330,7 +336,6 @@ async def debug_request_status(
    """Debug endpoint to check raw request status in database"""
    try:
        # Direct database query
-       from marbix.models.make_request import MakeRequest
        request = db.query(MakeRequest).filter(
            MakeRequest.request_id == request_id
        ).first()
@@ -360,18 +365,16 @@ async def websocket_endpoint(websocket: WebSocket, request_id: str):
     """Simplified real-time WebSocket endpoint with database polling"""
     await manager.connect(websocket, request_id)
     
-    db = None
     polling_task = None
-    heartbeat_task = None
+    receive_task = None
     
     try:
-        db = next(get_db())
         logger.info(f"🔌 WebSocket connected for {request_id}")
         
         # Check initial status
-        status = make_service.get_request_status(request_id, db)
+        status = await make_service.fetch_request_status(request_id)
         if not status:
-            await websocket.send_json({
+            await send_json(websocket, {
                 "type": "error",
                 "error": "Request not found",
                 "timestamp": datetime.utcnow().isoformat()
@@ -381,7 +384,7 @@ async def websocket_endpoint(websocket: WebSocket, request_id: str):
 
         # If already completed, send immediately and close
         if status.status == "completed":
-            await websocket.send_json({
+            await send_json(websocket, {
                 "request_id": request_id,
                 "type": "strategy_complete",
                 "status": "completed",
@@ -396,45 +399,53 @@ async def websocket_endpoint(websocket: WebSocket, request_id: str):
             await websocket.close(code=1000, reason="Completed")
             return
 
-        # If error, send error and close
-        if status.status == "error":
-            await websocket.send_json({
+        # If error or rejected by the content filter, send error and close
+        if status.status in ("error", "rejected"):
+            await send_json(websocket, {
                 "request_id": request_id,
                 "type": "error",
-                "status": "error",
+                "status": status.status,
                 "error": status.error or "Unknown error",
                 "timestamp": datetime.utcnow().isoformat()
             })
             await websocket.close(code=1000, reason="Error")
             return
 
-        # Send initial status
-        await websocket.send_json({
-            "request_id": request_id,
-            "type": "status_update",
-            "status": status.status,
-            "message": f"Current status: {status.status}",
-            "progress": 0.1 if status.status == "processing" else 0.0,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        # Send initial status; "processing" is by far the common case, so its frame is a
+        # prebuilt template (request_id has been validated as a UUID, so it needs no escaping)
+        if status.status == "processing":
+            await websocket.send_text(_PROCESSING_STATUS_TEMPLATE % (request_id, datetime.utcnow().isoformat()))
+        else:
+            await send_json(websocket, {
+                "request_id": request_id,
+                "type": "status_update",
+                "status": status.status,
+                "message": f"Current status: {status.status}",
+                "progress": 0.0,
+                "timestamp": datetime.utcnow().isoformat()
+            })
 
         # Start polling for status updates
         last_status = status.status
         
         async def poll_status():
+            # Returns only once a final status has been sent; lookup failures back off and retry
             nonlocal last_status
+            interval = _WS_POLL_INTERVAL
             while True:
                 try:
-                    await asyncio.sleep(2)  # Poll every 2 seconds
-                    current_status = make_service.get_request_status(request_id, db)
-                    
+                    await asyncio.sleep(interval)
+                    current_status = await make_service.fetch_request_status(request_id)
+
                     if not current_status:
-                        break
+                        interval = min(interval * 2, _WS_POLL_MAX_INTERVAL)
+                        continue
+                    interval = _WS_POLL_INTERVAL
                         
                     # Send update if status changed
                     if current_status.status != last_status:
                         if current_status.status == "completed":
-                            await websocket.send_json({
+                            await send_json(websocket, {
                                 "request_id": request_id,
                                 "type": "strategy_complete",
                                 "status": "completed",
@@ -445,18 +456,18 @@ async def websocket_endpoint(websocket: WebSocket, request_id: str):
                                 "timestamp": datetime.utcnow().isoformat()
                             })
                             logger.info(f"✅ Strategy completed and sent to {request_id}")
-                            break
-                        elif current_status.status == "error":
-                            await websocket.send_json({
+                            return
+                        elif current_status.status in ("error", "rejected"):
+                            await send_json(websocket, {
                                 "request_id": request_id,
                                 "type": "error",
-                                "status": "error",
+                                "status": current_status.status,
                                 "error": current_status.error or "Unknown error",
                                 "timestamp": datetime.utcnow().isoformat()
                             })
-                            break
+                            return
                         else:
-                            await websocket.send_json({
+                            await send_json(websocket, {
                                 "request_id": request_id,
                                 "type": "status_update",
                                 "status": current_status.status,
@@ -469,37 +480,48 @@ async def websocket_endpoint(websocket: WebSocket, request_id: str):
                         
                 except Exception as e:
                     logger.error(f"Polling error for {request_id}: {e}")
-                    break
+                    interval = min(interval * 2, _WS_POLL_MAX_INTERVAL)
 
-        async def send_heartbeat():
-            while True:
-                try:
-                    await asyncio.sleep(30)  # Heartbeat every 30 seconds
-                    await websocket.send_json({"type": "heartbeat"})
-                except Exception:
-                    break
+        async def receive_pings():
+            # One idle timer, re-armed per message, instead of a wait_for timeout around every receive
+            loop = asyncio.get_running_loop()
+            this_task = asyncio.current_task()
 
-        # Start background tasks
-        polling_task = asyncio.create_task(poll_status())
-        heartbeat_task = asyncio.create_task(send_heartbeat())
+            def on_idle():
+                logger.info(f"WebSocket timeout for {request_id}")
+                this_task.cancel()
 
-        # Wait for client messages or completion
-        while True:
+            idle = loop.call_later(settings.WS_CONNECTION_TIMEOUT, on_idle)
             try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=300)
-                if data == "ping":
-                    await websocket.send_text("pong")
-            except asyncio.TimeoutError:
-                logger.info(f"WebSocket timeout for {request_id}")
-                break
+                while True:
+                    data = await websocket.receive_text()
+                    idle.cancel()
+                    idle = loop.call_later(settings.WS_CONNECTION_TIMEOUT, on_idle)
+                    if data == "ping":
+                        await websocket.send_text("pong")
             except Exception as e:
                 logger.warning(f"WebSocket receive error for {request_id}: {e}")
-                break
+            finally:
+                idle.cancel()
+
+        # Finish on whichever comes first: the callback resolving the completion future,
+        # polling seeing a final status, or the client going away / idling out.
+        # Heartbeats come from the manager's shared ticker.
+        completion = manager.wait_for_completion(request_id, websocket)
+        polling_task = asyncio.create_task(poll_status())
+        receive_task = asyncio.create_task(receive_pings())
+        done, _ = await asyncio.wait(
+            {completion, polling_task, receive_task},
+            return_when=asyncio.FIRST_COMPLETED
+        )
+
+        if receive_task not in done:
+            await websocket.close(code=1000, reason="Completed")
 
     except Exception as e:
         logger.error(f"WebSocket error for {request_id}: {e}")
         try:
-            await websocket.send_json({
+            await send_json(websocket, {
                 "type": "error",
                 "error": f"WebSocket error: {str(e)}",
                 "timestamp": datetime.utcnow().isoformat()
@@ -510,11 +532,9 @@ async def websocket_endpoint(websocket: WebSocket, request_id: str):
         # Clean up tasks
         if polling_task:
             polling_task.cancel()
-        if heartbeat_task:
-            heartbeat_task.cancel()
-        if db:
-            db.close()
-        manager.disconnect(request_id)
+        if receive_task:
+            receive_task.cancel()
+        manager.disconnect(request_id, websocket)
         logger.info(f"🔌❌ WebSocket cleaned up for {request_id}")
 
 @router.post("/callback/{request_id}/sources")
@@ -526,6 +546,9 @@ async def handle_sources_callback(
    """Legacy sources callback handler for backward compatibility"""
    logger.info(f"Received legacy sources callback for request_id: {request_id}")
 
+   if await make_service.is_unknown_request(request_id):
+       raise HTTPException(status_code=404, detail="Request not found")
+
    try:
        sources_array = sources_data.sources
        logger.info(f"Received {len(sources_array)} sources for {request_id}")
@@ -536,28 +559,31 @@ async def handle_sources_callback(
        else:
            sources_text = ""
 
-       updated = await make_service.update_request_sources(
-           request_id=request_id,
-           sources=sources_text,
-           db=db
-       )
+       # The semaphore bounds the threads holding a pool connection; Redis work stays outside it
+       async with _CALLBACK_DB_SEM:
+           updated = await asyncio.to_thread(
+               make_service.update_request_sources,
+               request_id=request_id,
+               sources=sources_text,
+               db=db
+           )
+       if updated:
+           await make_service.invalidate_request_status(request_id)
 
        if not updated:
            logger.error(f"Failed to update sources for request_id: {request_id} - request not found")
            raise HTTPException(status_code=404, detail="Request not found")
 
-       current_status = make_service.get_request_status(request_id, db)
-
-       if current_status:
-           message = WebSocketMessage(
-               request_id=request_id,
-               status=current_status.status,
-               result=current_status.result,
-               sources=sources_text,
-               error=current_status.error
-           )
+       # The UPDATE returned the current status/result/error; no second lookup needed
+       message = WebSocketMessage(
+           request_id=request_id,
+           status=updated.status,
+           result=updated.result,
+           sources=sources_text,
+           error=updated.error
+       )
 
-           await manager.send_message(request_id, message.dict())
+       await manager.send_message(request_id, message.model_dump())
 
        return {
            "status": "ok",
@@ -566,6 +592,8 @@ async def handle_sources_callback(
            "sources_text_length": len(sources_text)
        }
 
+   except HTTPException:
+       raise
    except Exception as e:
        logger.error(f"Error handling sources callback for request_id {request_id}: {str(e)}")
        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -9,15 +9,41 @@ from marbix.schemas.enhanced_strategy import (
     EnhancedStrategyResponse
 )
 from marbix.models.make_request import MakeRequest
+from marbix.models.enhanced_strategy import EnhancementStatus
 from marbix.services.enhancement_service import enhancement_service
-from marbix.core.config import settings
-from arq import create_pool
+from arq.connections import ArqRedis
+from marbix.core.redis import get_arq_pool
 from typing import List, Optional
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# List view never shows result/sources, so don't load them
+_LIST_ITEM_COLUMNS = (
+    MakeRequest.request_id,
+    MakeRequest.request_data,
+    MakeRequest.status,
+    MakeRequest.created_at,
+    MakeRequest.completed_at,
+)
+
+
+def _strategy_list_item(row) -> StrategyListItem:
+    """Build a StrategyListItem from a _LIST_ITEM_COLUMNS row and its request_data JSON"""
+    get = (row.request_data or {}).get
+    return StrategyListItem(
+        request_id=row.request_id,
+        business_type=get("business_type", ""),
+        business_goal=get("business_goal", ""),
+        location=get("location", ""),
+        promotion_budget=get("promotion_budget"),
+        team_budget=get("team_budget"),
+        status=row.status,
+        created_at=row.created_at,
+        completed_at=row.completed_at
+    )
+
 @router.get("/strategies", response_model=List[StrategyListItem])
 async def get_user_strategies(
     current_user: User = Depends(get_current_user),
@@ -27,34 +53,15 @@ async def get_user_strategies(
 ):
     """Get list of user's completed strategies"""
     try:
-        # Получаем только завершенные стратегии пользователя
-        strategies = db.query(MakeRequest).filter(
+        # Получаем только завершенные стратегии пользователя (без тяжелого result)
+        rows = db.query(*_LIST_ITEM_COLUMNS).filter(
             MakeRequest.user_id == current_user.id,
             MakeRequest.status == "completed"
         ).order_by(
             MakeRequest.created_at.desc()
         ).offset(skip).limit(limit).all()
         
-        # Формируем ответ с нужными полями
-        result = []
-        for strategy in strategies:
-            # Извлекаем данные из request_data JSON
-            request_data = strategy.request_data or {}
-            
-            item = StrategyListItem(
-                request_id=strategy.request_id,
-                business_type=request_data.get("business_type", ""),
-                business_goal=request_data.get("business_goal", ""),
-                location=request_data.get("location", ""),
-                promotion_budget=request_data.get("promotion_budget"),
-                team_budget=request_data.get("team_budget"),
-                status=strategy.status,
-                created_at=strategy.created_at,
-                completed_at=strategy.completed_at
-            )
-            result.append(item)
-        
-        return result
+        return [_strategy_list_item(row) for row in rows]
         
     except Exception as e:
         print(f"Error getting user strategies: {str(e)}")
@@ -103,7 +110,8 @@ async def enhance_strategy(
     strategy_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    request: Optional[EnhancementRequest] = Body(default=None)
+    request: Optional[EnhancementRequest] = Body(default=None),
+    arq_pool: ArqRedis = Depends(get_arq_pool)
 ):
     """
     Enhance a strategy with 9 detailed sections using AI generation.
@@ -155,22 +163,17 @@ async def enhance_strategy(
         
         # 3. Queue enhancement worker job
         try:
-            from arq.connections import RedisSettings
-            redis_settings = RedisSettings.from_dsn(settings.REDIS_URL)
-            redis_pool = await create_pool(redis_settings)
-            await redis_pool.enqueue_job(
+            await arq_pool.enqueue_job(
                 "enhance_strategy_workflow",
                 enhancement_id=enhancement.id,
                 strategy_id=original_strategy.request_id,  # Use request_id
                 user_id=current_user.id
             )
-            await redis_pool.close()
             logger.info(f"Enhancement job queued for {enhancement.id}")
             
         except Exception as queue_error:
             logger.error(f"Failed to queue enhancement job: {queue_error}")
             # Update enhancement status to error
-            from marbix.models.enhanced_strategy import EnhancementStatus
             enhancement_service.update_enhancement_status(
                 enhancement.id, 
                 EnhancementStatus.ERROR, 
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from marbix.core.deps import get_db, get_current_user
 from marbix.models.user import User, SubscriptionStatus
-from marbix.schemas.user import SubscriptionStatusResponse, SubscriptionStatusEnum
+from marbix.schemas.user import SubscriptionStatusResponse, SubscriptionStatusEnum, SUBSCRIPTION_STATUS_TO_SCHEMA
 from marbix.utils.telegram import send_to_telegram
 
 router = APIRouter()
@@ -65,16 +65,10 @@ def get_subscription_status(
     """
     Get current user's subscription status.
     """
-    # Convert SubscriptionStatus enum to SubscriptionStatusEnum for response
-    status_mapping = {
-        SubscriptionStatus.FREE: SubscriptionStatusEnum.FREE,
-        SubscriptionStatus.PENDING_PRO: SubscriptionStatusEnum.PENDING_PRO,
-        SubscriptionStatus.PRO: SubscriptionStatusEnum.PRO
-    }
 
     print(current_user.subscription_status)
     return SubscriptionStatusResponse(
         success=True,
         message="Subscription status retrieved successfully",
-        subscription_status=status_mapping[current_user.subscription_status]
+        subscription_status=SUBSCRIPTION_STATUS_TO_SCHEMA[current_user.subscription_status]
     )
@@ -22,6 +22,10 @@ class Settings(BaseSettings):
         env="DATABASE_URL"
     )
 
+    # SQLAlchemy connection pool (per process)
+    DB_POOL_SIZE: int = Field(5, ge=1, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, ge=0, env="DB_MAX_OVERFLOW")
+
     # Redis configuration
     REDIS_URL: str = Field(
         "redis://localhost:6379/0",
@@ -62,6 +66,15 @@ class Settings(BaseSettings):
     WS_HEARTBEAT_INTERVAL: int = Field(30, env="WS_HEARTBEAT_INTERVAL")
     WS_CONNECTION_TIMEOUT: int = Field(300, env="WS_CONNECTION_TIMEOUT")
 
+    # Largest accepted Make.com callback body
+    MAX_CALLBACK_BYTES: int = Field(10 * 1024 * 1024, gt=0, env="MAX_CALLBACK_BYTES")  # 10 MB
+
+    # Cached status of completed requests (WebSocket connects / status polls)
+    REQUEST_STATUS_CACHE_TTL: int = Field(300, env="REQUEST_STATUS_CACHE_TTL")
+
+    # How long a request_id that wasn't found keeps answering 404 without a database lookup
+    UNKNOWN_REQUEST_TTL: int = Field(60, env="UNKNOWN_REQUEST_TTL")
+
     # Request cleanup
     REQUEST_CLEANUP_DELAY: int = Field(300, env="REQUEST_CLEANUP_DELAY")
 
@@ -70,6 +83,32 @@ class Settings(BaseSettings):
     ARQ_MAX_TRIES: int = Field(3, env="ARQ_MAX_TRIES")
     ARQ_RETRY_DELAY: int = Field(60, env="ARQ_RETRY_DELAY")  # 1 minute
 
+    # Max concurrent Perplexity requests per worker process
+    PERPLEXITY_MAX_CONCURRENCY: int = Field(10, env="PERPLEXITY_MAX_CONCURRENCY")
+
+    # Max concurrent Claude requests per worker process
+    ANTHROPIC_MAX_CONCURRENCY: int = Field(8, env="ANTHROPIC_MAX_CONCURRENCY")
+
+    # Claude strategy generation
+    ANTHROPIC_MAX_TOKENS: int = Field(6000, gt=0, env="ANTHROPIC_MAX_TOKENS")
+    ANTHROPIC_TEMPERATURE: float = Field(0.3, ge=0.0, le=1.0, env="ANTHROPIC_TEMPERATURE")
+    ANTHROPIC_TIMEOUT_S: float = Field(300.0, gt=0, env="ANTHROPIC_TIMEOUT_S")
+    ANTHROPIC_MAX_RETRIES: int = Field(3, ge=1, env="ANTHROPIC_MAX_RETRIES")
+    ANTHROPIC_RETRY_BACKOFF_S: float = Field(5.0, ge=0, env="ANTHROPIC_RETRY_BACKOFF_S")
+    ANTHROPIC_RETRY_BACKOFF_CAP_S: float = Field(120.0, ge=0, env="ANTHROPIC_RETRY_BACKOFF_CAP_S")
+
+    # Research result cache
+    RESEARCH_CACHE_TTL: int = Field(86400, env="RESEARCH_CACHE_TTL")  # 24 hours
+
+    # Successful content-filter verdicts
+    CONTENT_FILTER_CACHE_TTL: int = Field(86400, env="CONTENT_FILTER_CACHE_TTL")  # 24 hours
+
+    # Generated strategy cache
+    STRATEGY_CACHE_TTL: int = Field(86400, env="STRATEGY_CACHE_TTL")  # 24 hours
+
+    # Per-statement limit for admin endpoints, in milliseconds (0 disables)
+    ADMIN_STATEMENT_TIMEOUT_MS: int = Field(5000, ge=0, env="ADMIN_STATEMENT_TIMEOUT_MS")
+
     @validator('REDIS_URL')
     def validate_redis_url(cls, v):
         if not v.startswith(('redis://', 'rediss://')):
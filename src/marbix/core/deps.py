@@ -1,6 +1,7 @@
 from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, text
 from sqlalchemy.orm import Session
 import jwt
 from jwt import PyJWTError
@@ -26,6 +27,23 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def _set_admin_statement_timeout(session, transaction, connection):
+    # SET LOCAL only lasts for the current transaction, so it is reapplied on every begin
+    connection.execute(text(f"SET LOCAL statement_timeout = {settings.ADMIN_STATEMENT_TIMEOUT_MS}"))
+
+
+def get_admin_db(db: Session = Depends(get_db)) -> Session:
+    """
+    The request's database session with ADMIN_STATEMENT_TIMEOUT_MS applied to every
+    transaction, so a runaway admin query fails fast instead of holding a worker.
+    """
+    event.listen(db, "after_begin", _set_admin_statement_timeout)
+    if db.in_transaction():
+        # A dependency such as get_current_admin may have begun the transaction already
+        _set_admin_statement_timeout(db, None, db.connection())
+    return db
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
@@ -58,7 +76,11 @@ async def get_current_user(
     return user
 
 
-async def get_current_admin(token: str = Depends(oauth2_scheme_admin), db: Session = Depends(get_db)) -> User:
+def get_current_admin(token: str = Depends(oauth2_scheme_admin), db: Session = Depends(get_db)) -> User:
+    """
+    Decode the admin JWT and fetch the admin from the database.
+    Sync so the lookup runs in the threadpool; FastAPI caches it per request.
+    """
     try:
         payload = jwt.decode(token, settings.AUTH_SECRET, algorithms=["HS256"])
         user_id = payload.get("sub")
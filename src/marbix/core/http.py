@@ -0,0 +1,42 @@
+# src/marbix/core/http.py
+
+import asyncio
+from typing import Optional
+import httpx
+
+from marbix.core.config import settings
+
+ANTHROPIC_BASE_URL = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# Caps in-flight Claude calls so bursts queue here instead of running into 429s
+ANTHROPIC_SEM = asyncio.Semaphore(settings.ANTHROPIC_MAX_CONCURRENCY)
+
+# Process-wide Anthropic client so connections are reused across strategy calls
+_anthropic_client: Optional[httpx.AsyncClient] = None
+
+
+def get_anthropic_client() -> httpx.AsyncClient:
+    """Return the shared Anthropic HTTP client, creating it on first use"""
+    global _anthropic_client
+    if _anthropic_client is None or _anthropic_client.is_closed:
+        _anthropic_client = httpx.AsyncClient(
+            base_url=ANTHROPIC_BASE_URL,
+            http2=True,
+            timeout=httpx.Timeout(settings.ANTHROPIC_TIMEOUT_S, connect=10.0, pool=None),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={
+                "x-api-key": settings.ANTHROPIC_API_KEY,
+                "anthropic-version": ANTHROPIC_VERSION,
+                "content-type": "application/json"
+            }
+        )
+    return _anthropic_client
+
+
+async def close_anthropic_client():
+    """Close the shared Anthropic HTTP client (called on shutdown)"""
+    global _anthropic_client
+    if _anthropic_client is not None:
+        await _anthropic_client.aclose()
+        _anthropic_client = None
@@ -0,0 +1,15 @@
+# src/marbix/core/log_context.py
+
+import logging
+from contextvars import ContextVar
+
+# Identifier of the request/job being processed by the current task
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request_id to every log record passing through a handler"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
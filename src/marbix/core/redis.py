@@ -0,0 +1,50 @@
+# src/marbix/core/redis.py
+
+import asyncio
+from typing import Optional
+from arq import create_pool
+from arq.connections import ArqRedis
+from redis.asyncio import Redis
+
+from marbix.core.config import settings
+
+# Process-wide Redis client (connection pool is shared by all callers)
+_redis: Optional[Redis] = None
+
+# Process-wide ARQ pool for enqueueing jobs from the API
+_arq_pool: Optional[ArqRedis] = None
+_arq_pool_lock = asyncio.Lock()
+
+
+def get_redis() -> Redis:
+    """Return the shared async Redis client, creating it on first use"""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def close_redis():
+    """Close the shared Redis client (called on shutdown)"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def get_arq_pool() -> ArqRedis:
+    """Return the shared ARQ pool, creating it on first use (also usable as a FastAPI dependency)"""
+    global _arq_pool
+    if _arq_pool is None:
+        async with _arq_pool_lock:
+            if _arq_pool is None:
+                _arq_pool = await create_pool(settings.redis_settings)
+    return _arq_pool
+
+
+async def close_arq_pool():
+    """Close the shared ARQ pool (called on shutdown)"""
+    global _arq_pool
+    if _arq_pool is not None:
+        await _arq_pool.aclose()
+        _arq_pool = None
@@ -3,16 +3,30 @@ from typing import Dict, Optional
 from fastapi import WebSocket
 import logging
 import asyncio
+import orjson
 from datetime import datetime
+from marbix.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+_HEARTBEAT_MESSAGE = '{"type":"heartbeat"}'
+BROADCAST_BATCH_SIZE = 50
+
+
+async def send_json(websocket: WebSocket, message: dict):
+    """Like WebSocket.send_json but encoded with orjson; still a text frame so clients are unaffected"""
+    await websocket.send_text(orjson.dumps(message).decode())
+
+
 class ConnectionManager:
     """Simplified WebSocket manager focused on real-time delivery"""
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.connection_timestamps: Dict[str, datetime] = {}
+        # Keyed per socket (by id()): a second tab or a quick reconnect may briefly share a request_id
+        self.completions: Dict[str, Dict[int, asyncio.Future]] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
 
         
     async def connect(self, websocket: WebSocket, request_id: str):
@@ -22,13 +36,22 @@ class ConnectionManager:
         self.connection_timestamps[request_id] = datetime.utcnow()
         logger.info(f"🔌 WebSocket connected for request_id: {request_id}")
 
-    def disconnect(self, request_id: str):
-        """Remove a WebSocket connection"""
-        if request_id in self.active_connections:
+    def disconnect(self, request_id: str, websocket: WebSocket):
+        """Remove a WebSocket connection, unless request_id has since been taken over by another socket"""
+        completions = self.completions.get(request_id)
+        if completions is not None:
+            completion = completions.pop(id(websocket), None)
+            if completion is not None:
+                completion.cancel()
+            if not completions:
+                del self.completions[request_id]
+        if self.active_connections.get(request_id) is websocket:
             del self.active_connections[request_id]
             if request_id in self.connection_timestamps:
                 del self.connection_timestamps[request_id]
             logger.info(f"🔌❌ WebSocket disconnected for request_id: {request_id}")
+        elif request_id in self.active_connections:
+            logger.info(f"🔌 Superseded WebSocket closed for request_id: {request_id}")
         else:
             logger.warning(f"⚠️ Attempted to disconnect non-existent connection: {request_id}")
 
@@ -37,17 +60,64 @@ class ConnectionManager:
         if request_id in self.active_connections:
             websocket = self.active_connections[request_id]
             try:
-                await websocket.send_json(message)
+                await send_json(websocket, message)
                 logger.info(f"✅ Sent {message.get('type', 'unknown')} to {request_id}")
                 return True
             except Exception as e:
                 logger.error(f"❌ Error sending to {request_id}: {e}")
-                self.disconnect(request_id)
+                self.disconnect(request_id, websocket)
                 return False
         else:
             logger.debug(f"No active connection for {request_id}")
             return False
 
+    def wait_for_completion(self, request_id: str, websocket: WebSocket) -> asyncio.Future:
+        """Future resolved by complete() once the request's final message has been delivered to this socket"""
+        completion = asyncio.get_running_loop().create_future()
+        self.completions.setdefault(request_id, {})[id(websocket)] = completion
+        return completion
+
+    def complete(self, request_id: str, websocket: WebSocket):
+        """Signal the endpoint serving this socket that it can close"""
+        completion = self.completions.get(request_id, {}).get(id(websocket))
+        if completion is not None and not completion.done():
+            completion.set_result(None)
+
+    async def _send_heartbeat(self, request_id: str, websocket: WebSocket):
+        try:
+            await websocket.send_text(_HEARTBEAT_MESSAGE)
+        except Exception:
+            # The endpoint notices the dead socket on its next receive and cleans up
+            logger.debug(f"Heartbeat failed for {request_id}")
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL)
+            # Send concurrently in bounded batches, yielding to the loop between them
+            # so a large fan-out doesn't starve other coroutines
+            connections = list(self.active_connections.items())
+            for i in range(0, len(connections), BROADCAST_BATCH_SIZE):
+                await asyncio.gather(*(
+                    self._send_heartbeat(request_id, websocket)
+                    for request_id, websocket in connections[i:i + BROADCAST_BATCH_SIZE]
+                ))
+                await asyncio.sleep(0)
+
+    def start_heartbeat(self):
+        """Start the single heartbeat task shared by all connections (API startup)"""
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop_heartbeat(self):
+        """Stop the heartbeat task (API shutdown)"""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
     def get_connection_count(self) -> int:
         """Get number of active connections"""
         return len(self.active_connections)
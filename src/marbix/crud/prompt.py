@@ -1,8 +1,8 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, bindparam, update
 from marbix.models.prompt import Prompt
 from marbix.schemas.prompt import PromptCreate, PromptUpdate
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 def create_prompt(db: Session, prompt_data: PromptCreate, created_by: Optional[str] = None) -> Prompt:
@@ -137,6 +137,31 @@ def increment_prompt_usage(db: Session, prompt_id: str) -> Optional[Prompt]:
     db.refresh(db_prompt)
     return db_prompt
 
+def bulk_increment_prompt_usage(db: Session, usage_counts: Dict[str, int]) -> None:
+    """
+    Apply accumulated usage increments for several prompts in one transaction.
+    
+    :param db: SQLAlchemy Session
+    :param usage_counts: Mapping of prompt name to number of uses to add
+    """
+    if not usage_counts:
+        return
+    
+    prompts = Prompt.__table__
+    stmt = (
+        update(prompts)
+        .where(prompts.c.name == bindparam("prompt_name"))
+        .values(
+            usage_count=prompts.c.usage_count + bindparam("delta"),
+            last_used_at=datetime.now()
+        )
+    )
+    db.execute(stmt, [
+        {"prompt_name": name, "delta": delta}
+        for name, delta in usage_counts.items()
+    ])
+    db.commit()
+
 def get_prompts_by_category(db: Session, category: str) -> List[Prompt]:
     """
     Fetch all prompts in a specific category.
@@ -10,7 +10,9 @@ from marbix.core.config import settings
 engine = create_engine(
     settings.DATABASE_URL,
     echo=True,
-    future=True
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
 )
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -5,6 +5,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from marbix.api.v1 import api_router as main_router
 from marbix.core.config import settings
+from marbix.core.redis import get_arq_pool, close_arq_pool, close_redis
+from marbix.core.websocket import manager
 import os
 import logging
 
@@ -39,6 +41,8 @@ async def startup_event():
     """Initialize services on application startup"""
     try:
         logger.info("Starting Marbix API...")
+        await get_arq_pool()
+        manager.start_heartbeat()
         logger.info("Redis configuration verified")
         logger.info("Marbix API startup completed successfully")
 
@@ -52,6 +56,9 @@ async def shutdown_event():
     """Cleanup resources on application shutdown"""
     try:
         logger.info("Shutting down Marbix API...")
+        await manager.stop_heartbeat()
+        await close_arq_pool()
+        await close_redis()
         logger.info("Marbix API shutdown completed")
 
     except Exception as e:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, JSON, Integer
+from sqlalchemy import Column, String, Text, DateTime, JSON, Integer, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from marbix.db.base import Base
@@ -20,6 +20,11 @@ class MakeRequest(Base):
     retry_count = Column(Integer, default=0)
     max_retries = Column(Integer, default=3)
     callback_received_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Per-user listings, newest first (migration 7c4e2a9d1f30)
+    __table_args__ = (
+        Index("ix_make_requests_user_id_created_at", user_id, created_at.desc()),
+    )
     
     # Relationship to enhanced strategies
     enhancements = relationship("EnhancedStrategy", back_populates="original_strategy")
\ No newline at end of file
@@ -2,12 +2,17 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from enum import Enum
+from marbix.models.user import SubscriptionStatus
 
 class SubscriptionStatusEnum(str, Enum):
     FREE = "free"
     PENDING_PRO = "pending-pro"
     PRO = "pro"
 
+# Conversions between the DB enum and the API enum (same values), built once at import
+SUBSCRIPTION_STATUS_TO_SCHEMA = {status: SubscriptionStatusEnum(status.value) for status in SubscriptionStatus}
+SUBSCRIPTION_STATUS_FROM_SCHEMA = {schema: status for status, schema in SUBSCRIPTION_STATUS_TO_SCHEMA.items()}
+
 class UserOut(BaseModel):
     id: str
     email: str
@@ -1,5 +1,7 @@
 import os
+import threading
 import jwt
+from cachetools import TTLCache
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
@@ -7,7 +9,7 @@ from passlib.context import CryptContext
 from marbix.models.user import User, SubscriptionStatus
 from marbix.models.make_request import MakeRequest
 from marbix.models.role import UserRole
-from marbix.schemas.user import SubscriptionStatusEnum
+from marbix.schemas.user import SubscriptionStatusEnum, SUBSCRIPTION_STATUS_FROM_SCHEMA
 from typing import Optional
 from datetime import datetime, timedelta
 from sqlalchemy import func
@@ -15,6 +17,11 @@ from sqlalchemy import func
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 JWT_SECRET = os.getenv("AUTH_SECRET", "secret-key")
 
+# Dashboard statistics tolerate a few seconds of staleness
+STATISTICS_CACHE_TTL = 20
+_statistics_cache: TTLCache = TTLCache(maxsize=1, ttl=STATISTICS_CACHE_TTL)
+_statistics_lock = threading.Lock()
+
 
 def authenticate_admin(email: str, password: str, db: Session) -> str:
     """
@@ -40,23 +47,39 @@ def generate_admin_jwt(admin: User) -> str:
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
 
-def get_all_users(db: Session, subscription_status: Optional[SubscriptionStatusEnum] = None):
+# Columns exposed by UserOutAdmin; list endpoints select only these
+USER_ADMIN_COLUMNS = (
+    User.id,
+    User.email,
+    User.name,
+    User.number,
+    User.admin_comment,
+    User.created_at,
+    User.subscription_status,
+    User.subscription_updated_at,
+    User.subscription_granted_by,
+)
+
+
+def get_all_users(
+    db: Session,
+    subscription_status: Optional[SubscriptionStatusEnum] = None,
+    skip: int = 0,
+    limit: Optional[int] = None
+):
     """
-    Returns list of users (excluding admins) with optional subscription status filter.
+    Returns list of users (excluding admins) with optional subscription status filter and paging.
+    Rows are column mappings rather than User entities.
     """
-    query = db.query(User).filter(User.role != UserRole.ADMIN)
+    query = db.query(*USER_ADMIN_COLUMNS).filter(User.role != UserRole.ADMIN)
     
     if subscription_status:
         # Convert SubscriptionStatusEnum to SubscriptionStatus for database query
-        status_mapping = {
-            SubscriptionStatusEnum.FREE: SubscriptionStatus.FREE,
-            SubscriptionStatusEnum.PENDING_PRO: SubscriptionStatus.PENDING_PRO,
-            SubscriptionStatusEnum.PRO: SubscriptionStatus.PRO
-        }
-        db_status = status_mapping[subscription_status]
+        db_status = SUBSCRIPTION_STATUS_FROM_SCHEMA[subscription_status]
         query = query.filter(User.subscription_status == db_status)
     
-    return query.order_by(desc(User.created_at)).all()
+    rows = query.order_by(desc(User.created_at), desc(User.id)).offset(skip).limit(limit).all()
+    return [row._mapping for row in rows]
 
 
 def get_user_by_id(user_id: str, db: Session):
@@ -84,57 +107,41 @@ def get_admin_statistics(db: Session):
     """
     Returns admin dashboard statistics.
     """
-    # Total users (excluding admins)
-    total_users = db.query(func.count(User.id)).filter(User.role != UserRole.ADMIN).scalar()
-    
-    # Subscription statistics
-    free_users = db.query(func.count(User.id)).filter(
-        User.role != UserRole.ADMIN,
-        User.subscription_status == SubscriptionStatus.FREE
-    ).scalar()
-    
-    pending_pro_users = db.query(func.count(User.id)).filter(
-        User.role != UserRole.ADMIN,
-        User.subscription_status == SubscriptionStatus.PENDING_PRO
-    ).scalar()
-    
-    pro_users = db.query(func.count(User.id)).filter(
-        User.role != UserRole.ADMIN,
-        User.subscription_status == SubscriptionStatus.PRO
-    ).scalar()
-    
-    # Total strategies
-    total_strategies = db.query(func.count(MakeRequest.request_id)).join(User, MakeRequest.user_id == User.id).filter(User.role != UserRole.ADMIN).scalar()
-    
-    # Successful strategies (completed)
-    
-    successful_strategies = (
-    db.query(func.count(MakeRequest.request_id))
-      .join(User, MakeRequest.user_id == User.id)
-      .filter(
-          MakeRequest.status == "completed",
-          User.role       != UserRole.ADMIN
-      )
-      .scalar()
+    # Users (excluding admins) per subscription status, in one grouped count
+    users_by_status = dict(
+        db.query(User.subscription_status, func.count(User.id))
+        .filter(User.role != UserRole.ADMIN)
+        .group_by(User.subscription_status)
+        .all()
     )
-
-    # Calculate crashed strategies (processing > 20 minutes)
+    total_users = sum(users_by_status.values())
+    free_users = users_by_status.get(SubscriptionStatus.FREE, 0)
+    pending_pro_users = users_by_status.get(SubscriptionStatus.PENDING_PRO, 0)
+    pro_users = users_by_status.get(SubscriptionStatus.PRO, 0)
+
+    # Strategy counts in a single pass over make_requests. The outer join keeps
+    # strategies without a matching user for the processing count, which has
+    # never filtered by role; the other counts only include non-admin owners.
+    # Processing for more than 20 minutes counts as crashed.
     twenty_minutes_ago = datetime.utcnow() - timedelta(minutes=20)
-    failed_strategies = (
-    db.query(func.count(MakeRequest.request_id))
-      .join(User, MakeRequest.user_id == User.id)
-      .filter(
-          MakeRequest.status       == "processing",
-          MakeRequest.created_at   < twenty_minutes_ago,
-          User.role                != UserRole.ADMIN
-      )
-      .scalar())
-    
-    # Currently processing (within 20 minutes)
-    processing_strategies = db.query(func.count(MakeRequest.request_id)).filter(
-        MakeRequest.status == "processing",
-        MakeRequest.created_at >= twenty_minutes_ago
-    ).scalar()
+    not_admin = User.role != UserRole.ADMIN
+    processing = MakeRequest.status == "processing"
+    (
+        total_strategies,
+        successful_strategies,
+        failed_strategies,
+        processing_strategies,
+    ) = (
+        db.query(
+            func.count().filter(not_admin),
+            func.count().filter(not_admin, MakeRequest.status == "completed"),
+            func.count().filter(not_admin, processing, MakeRequest.created_at < twenty_minutes_ago),
+            func.count().filter(processing, MakeRequest.created_at >= twenty_minutes_ago),
+        )
+        .select_from(MakeRequest)
+        .outerjoin(User, MakeRequest.user_id == User.id)
+        .one()
+    )
     
     return {
         "total_users": total_users,
@@ -148,6 +155,22 @@ def get_admin_statistics(db: Session):
     }
 
 
+def get_admin_statistics_cached(db: Session):
+    """
+    Returns admin dashboard statistics, recomputed at most once per STATISTICS_CACHE_TTL.
+    Concurrent requests on a cold cache wait for a single computation.
+    """
+    stats = _statistics_cache.get("stats")
+    if stats is not None:
+        return stats
+
+    with _statistics_lock:
+        stats = _statistics_cache.get("stats")
+        if stats is None:
+            stats = _statistics_cache["stats"] = get_admin_statistics(db)
+    return stats
+
+
 def get_users_by_subscription_status(db: Session, subscription_status: SubscriptionStatus):
     """
     Returns users filtered by specific subscription status.
@@ -1,11 +1,14 @@
 import openai
 import json
 import asyncio
+import hashlib
+import orjson
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime
 
 from marbix.core.config import settings
+from marbix.core.redis import get_redis
 
 logger = logging.getLogger(__name__)
 
@@ -236,8 +239,26 @@ Location: {business_data.get('location', '')}
             """.strip()
             
             logger.info(f"Checking business request for user business type: {business_data.get('business_type', 'unknown')}")
-            
-            return await self.check_content(business_text)
+
+            # Identical submissions get the same verdict; only successful checks are cached
+            # so a transient GPT failure is retried next time
+            cache_key = "filter:" + hashlib.blake2b(business_text.encode(), digest_size=16).hexdigest()
+            try:
+                cached = await get_redis().get(cache_key)
+                if cached:
+                    logger.info("Content filter verdict served from cache")
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.warning(f"Content filter cache lookup failed: {str(e)}")
+
+            result = await self.check_content(business_text)
+
+            if result.get("success"):
+                try:
+                    await get_redis().setex(cache_key, settings.CONTENT_FILTER_CACHE_TTL, orjson.dumps(result))
+                except Exception as e:
+                    logger.warning(f"Failed to cache content filter verdict: {str(e)}")
+            return result
             
         except Exception as e:
             logger.error(f"Error checking business request: {str(e)}")
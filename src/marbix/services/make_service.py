@@ -6,11 +6,14 @@ import asyncio
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 import logging
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from arq import create_pool
 
 from marbix.core.config import settings
 from marbix.core.deps import get_db
+from marbix.core.redis import get_redis
+from marbix.db.session import SessionLocal
 from marbix.models.make_request import MakeRequest
 from marbix.schemas.make_integration import (
     MakeWebhookRequest,
@@ -98,7 +101,7 @@ class MakeService:
                 request.sources = sources
 
             # Mark as completed if final status
-            if status in ["completed", "failed", "error"]:
+            if status in ["completed", "failed", "error", "rejected"]:
                 request.completed_at = datetime.utcnow()
                 request.callback_received_at = datetime.utcnow()
 
@@ -137,52 +140,130 @@ class MakeService:
     def get_request_status(self, request_id: str, db: Session) -> Optional[ProcessingStatus]:
         """Get the current status of a request from database"""
         try:
-            request = db.query(MakeRequest).filter(
-                MakeRequest.request_id == request_id
-            ).first()
+            return self._query_request_status(request_id, db)
 
-            if not request:
-                logger.warning(f"Request {request_id} not found")
-                return None
+        except Exception as e:
+            logger.error(f"Failed to get status for {request_id}: {str(e)}")
+            return None
 
-            return ProcessingStatus(
-                request_id=request.request_id,
-                user_id=request.user_id,
-                status=request.status,
-                result=request.result,
-                error=request.error,
-                sources=request.sources,
-                created_at=request.created_at,
-                completed_at=request.completed_at,
-                retry_count=request.retry_count
-            )
+    @staticmethod
+    def _query_request_status(request_id: str, db: Session) -> Optional[ProcessingStatus]:
+        request = db.query(MakeRequest).filter(
+            MakeRequest.request_id == request_id
+        ).first()
+
+        if not request:
+            logger.warning(f"Request {request_id} not found")
+            return None
+
+        return ProcessingStatus(
+            request_id=request.request_id,
+            user_id=request.user_id,
+            status=request.status,
+            result=request.result,
+            error=request.error,
+            sources=request.sources,
+            created_at=request.created_at,
+            completed_at=request.completed_at,
+            retry_count=request.retry_count
+        )
+
+    @staticmethod
+    def _status_cache_key(request_id: str) -> str:
+        return f"req:{request_id}:status"
+
+    @staticmethod
+    def _missing_cache_key(request_id: str) -> str:
+        return f"req:{request_id}:missing"
+
+    async def is_unknown_request(self, request_id: str) -> bool:
+        """
+        True when request_id cannot refer to a request: it is not a UUID, or it was
+        looked up recently and not found. Lets endpoints answer 404 without the database.
+        """
+        try:
+            uuid.UUID(request_id)
+        except ValueError:
+            return True
+        try:
+            return bool(await get_redis().exists(self._missing_cache_key(request_id)))
+        except Exception as e:
+            logger.warning(f"Unknown-request lookup failed for {request_id}: {str(e)}")
+            return False
+
+    async def fetch_request_status(self, request_id: str) -> Optional[ProcessingStatus]:
+        """
+        Get request status without blocking the event loop (own short-lived session, run in a thread).
+        Completed requests are served from Redis; other statuses still change and always hit the database.
+        """
+        if await self.is_unknown_request(request_id):
+            return None
+
+        key = self._status_cache_key(request_id)
+        try:
+            cached = await get_redis().get(key)
+            if cached:
+                return ProcessingStatus.model_validate_json(cached)
+        except Exception as e:
+            logger.warning(f"Status cache lookup failed for {request_id}: {str(e)}")
 
+        try:
+            status = await asyncio.to_thread(self._fetch_request_status_sync, request_id)
         except Exception as e:
             logger.error(f"Failed to get status for {request_id}: {str(e)}")
             return None
 
-    async def update_request_sources(self, request_id: str, sources: str, db: Session) -> bool:
-        """Update sources for a specific request"""
         try:
-            request_record = db.query(MakeRequest).filter(
-                MakeRequest.request_id == request_id
+            if status is None:
+                await get_redis().setex(self._missing_cache_key(request_id), settings.UNKNOWN_REQUEST_TTL, 1)
+            elif status.status == "completed":
+                await get_redis().setex(key, settings.REQUEST_STATUS_CACHE_TTL, status.model_dump_json())
+        except Exception as e:
+            logger.warning(f"Failed to cache status for {request_id}: {str(e)}")
+        return status
+
+    async def invalidate_request_status(self, request_id: str):
+        """Drop the cached status after a write from the API process"""
+        try:
+            await get_redis().delete(self._status_cache_key(request_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cached status for {request_id}: {str(e)}")
+
+    def _fetch_request_status_sync(self, request_id: str) -> Optional[ProcessingStatus]:
+        db = SessionLocal()
+        try:
+            return self._query_request_status(request_id, db)
+        finally:
+            db.close()
+
+    def update_request_sources(self, request_id: str, sources: str, db: Session):
+        """
+        Update sources for a specific request in a single UPDATE ... RETURNING.
+        Returns the request's status, result and error (None if not found or on failure).
+        Blocking; call through asyncio.to_thread from async code and invalidate the cached status afterwards.
+        """
+        try:
+            row = db.execute(
+                update(MakeRequest)
+                .where(MakeRequest.request_id == request_id)
+                .values(sources=sources)
+                .returning(MakeRequest.status, MakeRequest.result, MakeRequest.error)
             ).first()
 
-            if not request_record:
+            if row is None:
                 logger.error(f"Request {request_id} not found for sources update")
-                return False
+                db.rollback()
+                return None
 
-            request_record.sources = sources
             db.commit()
-            db.refresh(request_record)
 
             logger.info(f"Sources updated for request {request_id}")
-            return True
+            return row
 
         except Exception as e:
             logger.error(f"Failed to update sources for {request_id}: {str(e)}")
             db.rollback()
-            return False
+            return None
 
     async def notify_user_status(
             self,
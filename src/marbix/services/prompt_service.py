@@ -5,6 +5,7 @@ from marbix.crud.prompt import (
     get_prompts_by_category, get_active_prompts
 )
 from marbix.schemas.prompt import PromptCreate, PromptUpdate, PromptResponse, PromptListItem
+from marbix.utils.prompt_cache import invalidate_prompt
 from typing import List, Optional
 from fastapi import HTTPException
 
@@ -116,10 +117,14 @@ class PromptService:
                     detail=f"Prompt with name '{prompt_data.name}' already exists"
                 )
         
+        old_name = existing_prompt.name
         updated_prompt = update_prompt(db, prompt_id, prompt_data)
         if not updated_prompt:
             raise HTTPException(status_code=404, detail="Prompt not found")
         
+        invalidate_prompt(old_name)
+        invalidate_prompt(updated_prompt.name)
+        
         return PromptResponse.model_validate(updated_prompt)
     
     @staticmethod
@@ -137,10 +142,13 @@ class PromptService:
         if not existing_prompt:
             raise HTTPException(status_code=404, detail="Prompt not found")
         
+        prompt_name = existing_prompt.name
         success = delete_prompt(db, prompt_id)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete prompt")
         
+        invalidate_prompt(prompt_name)
+        
         return True
     
     @staticmethod
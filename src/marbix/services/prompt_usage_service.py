@@ -0,0 +1,72 @@
+# src/marbix/services/prompt_usage_service.py
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+from marbix.db.session import SessionLocal
+from marbix.crud.prompt import bulk_increment_prompt_usage
+
+logger = logging.getLogger(__name__)
+
+
+class PromptUsageService:
+    """Buffers prompt usage increments in memory and writes them to the database in batches"""
+
+    def __init__(self, flush_interval: float = 5.0):
+        self.flush_interval = flush_interval
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, prompt_name: str):
+        """Count one use of a prompt; persisted on the next flush"""
+        self._counts[prompt_name] += 1
+
+    async def flush(self):
+        """Write all pending increments in a single transaction"""
+        if not self._counts:
+            return
+
+        pending, self._counts = self._counts, defaultdict(int)
+        try:
+            await asyncio.to_thread(self._flush_sync, pending)
+            logger.debug(f"Flushed usage for {len(pending)} prompts")
+        except Exception as e:
+            logger.warning(f"Failed to flush prompt usage: {str(e)}")
+            # Keep the counts for the next attempt
+            for name, delta in pending.items():
+                self._counts[name] += delta
+
+    @staticmethod
+    def _flush_sync(pending: Dict[str, int]):
+        db = SessionLocal()
+        try:
+            bulk_increment_prompt_usage(db, pending)
+        finally:
+            db.close()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        """Start the periodic flush task (worker startup)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush task and write what is left (worker shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# Global service instance
+prompt_usage_service = PromptUsageService()
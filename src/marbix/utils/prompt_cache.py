@@ -0,0 +1,55 @@
+"""
+In-process cache for formatted prompts.
+
+Prompts change rarely and many jobs share the same business context, so the
+agents keep recently formatted prompts in memory instead of hitting the
+database on every call. Entries expire after a short TTL, which also bounds
+staleness in processes that never see an explicit invalidation (e.g. the ARQ
+worker when a prompt is edited through the API).
+"""
+
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+PROMPT_CACHE_MAXSIZE = 1024
+PROMPT_CACHE_TTL = 300  # 5 minutes
+
+_PROMPT_CACHE: TTLCache = TTLCache(maxsize=PROMPT_CACHE_MAXSIZE, ttl=PROMPT_CACHE_TTL)
+
+
+def make_prompt_cache_key(prompt_name: str, variables: Dict[str, Any]) -> Tuple[str, bytes]:
+    """
+    Build a cache key from the prompt name and a stable hash of its variables.
+
+    :param prompt_name: Name of the prompt
+    :param variables: Variables used to format the prompt
+    :return: Hashable cache key
+    """
+    digest = hashlib.blake2b(
+        orjson.dumps(variables, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS),
+        digest_size=16
+    ).digest()
+    return prompt_name, digest
+
+
+def get_cached_prompt(key: Tuple[str, bytes]) -> Optional[str]:
+    """Return a cached formatted prompt or None on miss."""
+    return _PROMPT_CACHE.get(key)
+
+
+def set_cached_prompt(key: Tuple[str, bytes], prompt: str) -> None:
+    """Store a formatted prompt in the cache."""
+    _PROMPT_CACHE[key] = prompt
+
+
+def invalidate_prompt(prompt_name: str) -> None:
+    """
+    Drop all cached entries for a prompt.
+
+    :param prompt_name: Name of the prompt that was changed
+    """
+    for key in [k for k in list(_PROMPT_CACHE.keys()) if k[0] == prompt_name]:
+        _PROMPT_CACHE.pop(key, None)
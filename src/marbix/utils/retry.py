@@ -0,0 +1,66 @@
+"""
+Retry helpers shared by the HTTP agents.
+
+Both agents hand-roll their retry loops around streamed requests; these
+helpers keep the backoff policy in one place: honor a numeric Retry-After
+header, otherwise use jittered exponential backoff so concurrent workers
+don't retry in lockstep.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 120
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    resp: Optional[httpx.Response] = None,
+    max_delay: float = MAX_BACKOFF
+) -> float:
+    """
+    Compute the delay before the next retry attempt.
+
+    :param attempt: Zero-based index of the attempt that just failed
+    :param base_delay: Minimum delay in seconds
+    :param resp: Failed response, checked for a Retry-After header
+    :param max_delay: Upper bound of the exponential backoff in seconds
+    :return: Delay in seconds
+    """
+    if resp is not None:
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return int(retry_after)
+    return random.uniform(base_delay, max(base_delay, min(base_delay * (2 ** attempt), max_delay)))
+
+
+async def sleep_or_give_up(
+    attempt: int,
+    max_retries: int,
+    base_delay: float,
+    resp: Optional[httpx.Response] = None,
+    max_delay: float = MAX_BACKOFF
+) -> bool:
+    """
+    Sleep before the next attempt.
+
+    :param attempt: Zero-based index of the attempt that just failed
+    :param max_retries: Total number of attempts allowed
+    :param base_delay: Minimum delay in seconds
+    :param resp: Failed response, checked for a Retry-After header
+    :param max_delay: Upper bound of the exponential backoff in seconds
+    :return: False if this was the last attempt and the caller should give up
+    """
+    if attempt >= max_retries - 1:
+        return False
+    wait_time = backoff_delay(attempt, base_delay, resp, max_delay)
+    logger.warning("Waiting %.1fs before retry %d", wait_time, attempt + 2)
+    await asyncio.sleep(wait_time)
+    return True
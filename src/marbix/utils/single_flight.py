@@ -0,0 +1,71 @@
+"""
+In-process request coalescing.
+
+When several jobs in the same worker ask for the same expensive result at the
+same time (retries, page refreshes, duplicate submissions), only the first
+one does the work; the others await its result instead of issuing their own
+upstream call.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The call a follower was waiting on was cancelled before it finished"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into a single execution"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """Return True if a call for this key is currently running"""
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn unless a call for the same key is already running, in which
+        case wait for that call's result (or exception) instead.
+
+        The check and the insert happen without an await in between, so no
+        lock is needed on a single event loop. If the running call is
+        cancelled (job timeout, shutdown), its followers don't inherit the
+        cancellation: one of them takes over and runs fn itself.
+
+        :param key: Key identifying identical requests
+        :param fn: Zero-argument coroutine function producing the result
+        :return: Result of the (possibly shared) call
+        """
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                # shield: a cancelled follower must not cancel the leader's future
+                return await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved so an unawaited future doesn't log a warning
+            future.exception()
+            raise
+        except BaseException:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
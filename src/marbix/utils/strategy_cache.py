@@ -0,0 +1,58 @@
+"""
+Redis cache for generated strategies.
+
+Users often retry or re-run a request with the same inputs. The strategy is a
+function of the model, the formatted strategy prompt and the research output,
+so an exact match on those returns the stored strategy instead of spending
+another Claude call.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson
+
+from marbix.core.config import settings
+from marbix.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def make_strategy_cache_key(model_name: str, prompt: str, research_output: Dict[str, Any]) -> str:
+    """
+    Build the Redis key for a strategy request from its canonical JSON form.
+
+    :param model_name: Claude model used for generation
+    :param prompt: Formatted strategy prompt
+    :param research_output: Research output passed to the model
+    :return: Redis key
+    """
+    canonical = orjson.dumps(
+        {
+            "model": model_name,
+            "prompt": prompt,
+            "research_content": research_output.get("research_content", ""),
+            "sources": research_output.get("sources", []),
+        },
+        option=orjson.OPT_SORT_KEYS
+    )
+    return f"strategy:{hashlib.sha256(canonical).hexdigest()}"
+
+
+async def get_cached_strategy(key: str) -> Optional[str]:
+    """Return a cached strategy or None on miss or Redis error."""
+    try:
+        cached = await get_redis().get(key)
+        return cached.decode() if cached else None
+    except Exception as e:
+        logger.warning("Strategy cache lookup failed: %s", e)
+        return None
+
+
+async def cache_strategy(key: str, strategy: str) -> None:
+    """Store a generated strategy for STRATEGY_CACHE_TTL seconds."""
+    try:
+        await get_redis().setex(key, settings.STRATEGY_CACHE_TTL, strategy)
+    except Exception as e:
+        logger.warning("Failed to cache strategy: %s", e)
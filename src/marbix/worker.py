@@ -3,25 +3,41 @@
 import asyncio
 import logging
 from typing import Dict, Any
-from datetime import datetime
+from arq import Retry
 from arq.connections import RedisSettings
 
 from marbix.core.config import settings
-from marbix.core.deps import get_db
+from marbix.db.session import SessionLocal
+from marbix.core.redis import close_redis
+from marbix.core.http import close_anthropic_client
+from marbix.core.log_context import RequestIdFilter
 from marbix.services.make_service import make_service
+from marbix.services.content_filter_service import content_filter_service
 from marbix.services.enhancement_service import enhancement_service
-from marbix.agents.researcher.researcher_agent import conduct_research_async
+from marbix.services.prompt_usage_service import prompt_usage_service
+from marbix.agents.researcher.researcher_agent import conduct_research_async, close_http_client
 from marbix.agents.strategy_generator.strategy_agent import generate_strategy_async
 from marbix.schemas.enhanced_strategy import EnhancementPromptType
 from marbix.models.enhanced_strategy import EnhancementStatus
 
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    format="%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
 )
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(RequestIdFilter())
 logger = logging.getLogger(__name__)
 
+# arq imports this module before it creates the worker's event loop
+if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 
 async def generate_strategy(ctx, request_id: str, user_id: str, request_data: Dict[str, Any], **kwargs):
     """
@@ -37,11 +53,36 @@ async def generate_strategy(ctx, request_id: str, user_id: str, request_data: Di
 
         # Get database session
         try:
-            db = next(get_db())
+            db = SessionLocal()
         except Exception as db_error:
             logger.error(f"Database connection failed: {str(db_error)}")
             raise Exception("Database connection failed")
 
+        # Step 0: Content filtering (kept off the API request path)
+        filter_result = await content_filter_service.check_business_request(request_data)
+        if not filter_result.get("success", False):
+            error_msg = f"Content filter unavailable: {filter_result.get('error', 'Unknown error')}"
+            job_try = ctx.get("job_try", 1)
+            if job_try < settings.ARQ_MAX_TRIES:
+                # Transient: leave the request "processing" so clients keep waiting for the retry
+                logger.warning(f"{error_msg}; retrying (try {job_try} of {settings.ARQ_MAX_TRIES})")
+                raise Retry(defer=settings.ARQ_RETRY_DELAY)
+            raise Exception(error_msg)
+
+        if not filter_result["is_allowed"]:
+            logger.info(
+                f"Content rejected for {request_id}. "
+                f"Violated topics: {filter_result['violated_topics']}, "
+                f"Reason: {filter_result['reason']}"
+            )
+            make_service.update_request_status(
+                request_id=request_id,
+                status="rejected",
+                error=f"Policy violation: {filter_result['reason']}",
+                db=db
+            )
+            return
+
         # Step 1: Research phase
         logger.info(f"Starting research for {request_id}")
         research_result = await conduct_research_async(
@@ -102,6 +143,9 @@ async def generate_strategy(ctx, request_id: str, user_id: str, request_data: Di
             logger.error(f"Failed to save strategy: {db_error}")
             raise
 
+    except Retry:
+        raise
+
     except Exception as e:
         error_msg = str(e)
         logger.error(f"Strategy generation failed for {request_id}: {error_msg}")
@@ -136,7 +180,7 @@ async def research_only_workflow(ctx, request_id: str, user_id: str, request_dat
     try:
         logger.info(f"Starting research-only workflow for {request_id}")
         
-        db = next(get_db())
+        db = SessionLocal()
         
         research_result = await conduct_research_async(
             db=db,
@@ -166,7 +210,7 @@ async def strategy_only_workflow(ctx, request_id: str, user_id: str, request_dat
     try:
         logger.info(f"Starting strategy-only workflow for {request_id}")
         
-        db = next(get_db())
+        db = SessionLocal()
         
         strategy_result = await generate_strategy_async(
             db=db,
@@ -222,7 +266,7 @@ async def enhance_strategy_workflow(ctx, enhancement_id: str, strategy_id: str,
         
         # Get database session
         try:
-            db = next(get_db())
+            db = SessionLocal()
         except Exception as db_error:
             logger.error(f"Database connection failed: {str(db_error)}")
             raise Exception("Database connection failed")
@@ -354,9 +398,26 @@ async def enhance_strategy_workflow(ctx, enhancement_id: str, strategy_id: str,
                 logger.warning(f"Error closing database: {close_err}")
 
 
+async def on_startup(ctx):
+    """Start process-wide background services"""
+    prompt_usage_service.start()
+    logger.info("Worker startup: prompt usage flusher started")
+
+
+async def on_shutdown(ctx):
+    """Release process-wide resources held by the agents"""
+    await prompt_usage_service.stop()
+    await close_http_client()
+    await close_anthropic_client()
+    await close_redis()
+    logger.info("Worker shutdown: prompt usage flushed, HTTP and Redis clients closed")
+
+
 # ARQ Worker Settings
 class WorkerSettings:
     functions = [generate_strategy, research_only_workflow, strategy_only_workflow, enhance_strategy_workflow]
+    on_startup = on_startup
+    on_shutdown = on_shutdown
     redis_settings = RedisSettings.from_dsn(settings.REDIS_URL)
     job_timeout = settings.ARQ_JOB_TIMEOUT
     max_tries = settings.ARQ_MAX_TRIES
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+
+from marbix.utils.single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_followers_share_leader_result(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", fn) for _ in range(3)))
+
+        self.assertEqual(results, ["result"] * 3)
+        self.assertEqual(calls, 1)
+        self.assertFalse(flight.in_flight("key"))
+
+    async def test_followers_share_leader_exception(self):
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("key", fn), flight.do("key", fn), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_leader_cancellation_does_not_cancel_followers(self):
+        flight = SingleFlight()
+        calls = 0
+        leader_started = asyncio.Event()
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            leader_started.set()
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.create_task(flight.do("key", fn))
+        await leader_started.wait()
+        follower = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        self.assertEqual(await follower, "result")
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        # The follower took over and ran fn itself
+        self.assertEqual(calls, 2)
+        self.assertFalse(flight.in_flight("key"))
+
+    async def test_cancelled_follower_does_not_cancel_leader(self):
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            return "result"
+
+        leader = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0)
+
+        follower.cancel()
+
+        self.assertEqual(await leader, "result")
+        with self.assertRaises(asyncio.CancelledError):
+            await follower
+
+
+if __name__ == "__main__":
+    unittest.main()
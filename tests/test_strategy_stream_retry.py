@@ -0,0 +1,94 @@
+import os
+import unittest
+from contextlib import asynccontextmanager
+from unittest import mock
+
+# Settings are read at import time; give the required ones dummy values
+for _name in (
+    "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET", "GOOGLE_REDIRECT_URI",
+    "PERPLEXITY_API_KEY", "OPENAI_API_KEY", "ANTHROPIC_API_KEY",
+):
+    os.environ.setdefault(_name, "test")
+
+import httpx
+
+from marbix.agents.strategy_generator import strategy_agent
+from marbix.agents.strategy_generator.strategy_agent import StrategyGeneratorAgent
+
+
+def _delta(text):
+    return 'data: {"type":"content_block_delta","delta":{"type":"text_delta","text":"%s"}}' % text
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, lines, error=None):
+        self._lines = lines
+        self._error = error
+
+    async def aiter_lines(self):
+        for line in self._lines:
+            yield line
+        if self._error is not None:
+            raise self._error
+
+
+class _FakeClient:
+    """Serves one canned response per attempt and counts the attempts"""
+
+    def __init__(self, responses):
+        self._responses = list(responses)
+        self.calls = 0
+
+    @asynccontextmanager
+    async def stream(self, method, url, content=None):
+        self.calls += 1
+        yield self._responses.pop(0)
+
+
+class StrategyStreamRetryTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.agent = StrategyGeneratorAgent()
+        self.tokens = []
+        # No real backoff between attempts
+        patcher = mock.patch.object(StrategyGeneratorAgent, "_retry_wait", mock.AsyncMock(return_value=True))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def on_token(self, text):
+        self.tokens.append(text)
+
+    async def _run(self, client):
+        with mock.patch.object(strategy_agent, "get_anthropic_client", return_value=client):
+            return await self.agent._make_strategy_request("prompt", {"research_content": "r"}, self.on_token)
+
+    async def test_partial_stream_is_not_retried(self):
+        client = _FakeClient([
+            _FakeResponse([_delta("Hel")], error=httpx.ReadTimeout("read timed out")),
+            _FakeResponse([_delta("Hello")]),
+        ])
+
+        strategy = await self._run(client)
+
+        self.assertIsNone(strategy)
+        self.assertEqual(client.calls, 1)
+        # The emitted prefix was not replayed
+        self.assertEqual(self.tokens, ["Hel"])
+
+    async def test_failure_before_any_token_is_retried(self):
+        client = _FakeClient([
+            _FakeResponse([], error=httpx.ReadTimeout("read timed out")),
+            _FakeResponse([_delta("Hel"), _delta("lo")]),
+        ])
+
+        strategy = await self._run(client)
+
+        self.assertEqual(strategy, "Hello")
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(self.tokens, ["Hel", "lo"])
+
+
+if __name__ == "__main__":
+    unittest.main()